@@ -0,0 +1,191 @@
+"""Аутентификация по JWT с кэшем пользователей в памяти процесса
+и необязательным восстановлением пользователя из данных токена без
+запроса к БД."""
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+# Поля пользователя, которые записываются в токен доступа и которых
+# достаточно для проверки прав доступа.
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+REVOKED_KEY_TEMPLATE = 'jwt-revoked:{user_id}'
+# Время выдачи токена с точностью до долей секунды: стандартное поле iat
+# хранит целые секунды, и по нему токен, выданный в ту же секунду
+# после отзыва, нельзя отличить от отозванного.
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+class UserClaimsAccessToken(AccessToken):
+    """Токен доступа с данными пользователя для проверки прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[ISSUED_AT_CLAIM] = time.time()
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, восстановленный из данных токена доступа.
+
+    Поддерживает те же проверки прав, что и модель User, но не связан
+    с БД: сохранить его нельзя.
+    """
+
+    Roles = User.Roles
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', self.Roles.USER.value)
+
+    # Те же правила определения прав, что и у модели User.
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+
+
+def revoke_user_tokens(user_id):
+    """Отзыв всех выданных до текущего момента токенов пользователя.
+
+    Время отзыва сохраняется в БД, а отметка в кэше сбрасывается.
+    Возвращает время отзыва.
+    """
+    revoked_at = timezone.now()
+    User.objects.filter(pk=user_id).update(tokens_valid_after=revoked_at)
+    cache.delete(REVOKED_KEY_TEMPLATE.format(user_id=user_id))
+    return revoked_at
+
+
+def get_tokens_valid_after(user_id):
+    """Время (timestamp), до которого выданные токены пользователя
+    отозваны.
+
+    Значение берётся из кэша, а при его отсутствии (в том числе после
+    вытеснения) — из БД, поэтому вытеснение не возвращает силу отозванным
+    токенам. Для удалённого пользователя отозваны все токены. В кэше
+    значение хранится JWT_USER_CACHE_TIMEOUT секунд, что ограничивает
+    задержку отзыва в других процессах с отдельным кэшем.
+    """
+    key = REVOKED_KEY_TEMPLATE.format(user_id=user_id)
+    valid_after = cache.get(key)
+    if valid_after is None:
+        row = User.objects.filter(pk=user_id).order_by().values_list(
+            'tokens_valid_after', flat=True)
+        if not row:
+            valid_after = math.inf
+        elif row[0] is None:
+            valid_after = 0.0
+        else:
+            valid_after = row[0].timestamp()
+        cache.set(key, valid_after, settings.JWT_USER_CACHE_TIMEOUT)
+    return valid_after
+
+
+class UserCache:
+    """Кэш пользователей по ID в памяти процесса с вытеснением давно
+    не использованных записей (LRU) и ограниченным временем жизни.
+
+    Размер и время жизни задаются настройками JWT_USER_CACHE_SIZE
+    и JWT_USER_CACHE_TIMEOUT; при нулевом размере кэш не используется.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return settings.JWT_USER_CACHE_SIZE > 0
+
+    def get(self, user_id):
+        """Копия пользователя из кэша или None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            # Копия, чтобы изменения в одном запросе не влияли на другие.
+            return copy.copy(entry[1])
+
+    def set(self, user):
+        expires = time.monotonic() + settings.JWT_USER_CACHE_TIMEOUT
+        with self.lock:
+            self.entries[user.pk] = (expires, copy.copy(user))
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > settings.JWT_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Количество попаданий, промахов и записей в кэше."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self.entries)}
+
+
+user_cache = UserCache()
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """Аутентификация по JWT.
+
+    Пользователи берутся из кэша user_cache, который сбрасывается
+    сигналами при изменении и удалении пользователя. При
+    settings.JWT_STATELESS_AUTH пользователь восстанавливается из данных
+    токена (ClaimsUser), а токены, выданные до изменения прав или удаления
+    пользователя, отклоняются; время отзыва берётся из кэша и лишь
+    после истечения записи — из БД.
+    """
+    stateless_authentication_class = (
+        authentication.JWTStatelessUserAuthentication)
+
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_AUTH:
+            return self.get_cached_user(validated_token)
+        user = self.stateless_authentication_class().get_user(
+            validated_token)
+        issued_at = validated_token.get(
+            ISSUED_AT_CLAIM, validated_token.get('iat', 0))
+        if issued_at <= get_tokens_valid_after(user.pk):
+            raise InvalidToken('Токен отозван.')
+        return user
+
+    def get_cached_user(self, validated_token):
+        """Пользователь из кэша или из БД с сохранением в кэш."""
+        if not user_cache.enabled:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        return user
@@ -1,18 +1,154 @@
-from rest_framework import mixins
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status
 from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from .cache import bump_cache_version, get_cache_version
 from .permissions import IsAdminOrReadOnly
 
 
+class ConditionalGetMixin:
+    """Поддержка условных GET-запросов (ETag и Last-Modified).
+
+    get_conditional_validators возвращает строку версии и дату
+    последнего изменения данных или None, если данных нет. Для списка
+    они вычисляются дешёвым запросом, для объекта — по уже загруженному
+    объекту, поэтому ответ 304 отдаётся без сериализации данных.
+    """
+
+    def get_conditional_validators(self, instance=None):
+        raise NotImplementedError(
+            'Метод get_conditional_validators() должен быть определён.')
+
+    def conditional_response(self, request, validators, render):
+        """Ответ 304 или ответ render с заголовками ETag и Last-Modified."""
+        if validators is None:
+            return render()
+        version, modified = validators
+        signature = (f'{version}:{request.get_full_path()}:'
+                     f'{request.accepted_media_type}')
+        etag = quote_etag(hashlib.md5(
+            signature.encode(), usedforsecurity=False).hexdigest())
+        last_modified = int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_conditional_validators(),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request,
+            self.get_conditional_validators(instance),
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+
+class CountCacheInvalidationMixin:
+    """Сброс закэшированного количества объектов при создании и удалении.
+
+    count_cache_models перечисляет модели, количество объектов которых
+    меняется при создании и удалении (с учётом каскадного удаления).
+    """
+    count_cache_models = ()
+
+    def invalidate_count_cache(self):
+        """Сброс кэша количества объектов для моделей ViewSet."""
+        bump_cache_version(*self.count_cache_models)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.invalidate_count_cache()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.invalidate_count_cache()
+
+
+class QueryPlanMixin:
+    """Подбор связанных объектов для queryset в зависимости от действия.
+
+    query_plans сопоставляет действию ViewSet словарь с ключами
+    select_related, prefetch_related и only.
+    """
+    query_plans = {}
+
+    def get_query_plan(self):
+        """Получение плана загрузки для текущего действия."""
+        return self.query_plans.get(self.action, {})
+
+    def get_queryset(self):
+        """Добавление к queryset связанных объектов по плану действия."""
+        queryset = super().get_queryset()
+        plan = self.get_query_plan()
+        if plan.get('select_related'):
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        if plan.get('only'):
+            queryset = queryset.only(*plan['only'])
+        return queryset
+
+
 class CategoryGenreViewSet(
+    CountCacheInvalidationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     GenericViewSet
 ):
-    """Базовый ViewSet для моделей Category и Genre."""
+    """Базовый ViewSet для моделей Category и Genre.
+
+    Ответы на запросы списка кэшируются по строке поиска и номеру
+    страницы; версия кэша меняется сигналами при изменении объектов.
+    """
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+
+    def get_list_cache_key(self, request):
+        """Ключ кэша ответа на запрос списка.
+
+        Адрес сайта, строка поиска и номер страницы задаются клиентом,
+        поэтому входят в ключ в виде хэша: ключ остаётся коротким
+        и без пробелов и управляющих символов (допустим для Memcached).
+        """
+        model = self.get_queryset().model
+        params = request.query_params
+        signature = hashlib.md5(repr((
+            request.build_absolute_uri('/'),
+            params.get('search', ''),
+            params.get('page', ''),
+        )).encode(), usedforsecurity=False).hexdigest()
+        label = model._meta.label_lower
+        version = get_cache_version(model)
+        return f'catalog:{label}:{version}:{signature}'
+
+    def list(self, request, *args, **kwargs):
+        """Получение списка из кэша или из БД с сохранением в кэш."""
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+        return Response(data)
@@ -0,0 +1,77 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.validators import slug_re
+
+VERSION_KEY_TEMPLATE = 'version:{label}'
+SLUG_KEY_TEMPLATE = 'slug:{label}:{version}:{slug}'
+
+
+def get_cache_version(model):
+    """Текущая версия закэшированных данных модели."""
+    key = VERSION_KEY_TEMPLATE.format(label=model._meta.label_lower)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_cache_version_time(*models):
+    """Время последней смены версии кэша моделей.
+
+    Версия — время её смены в наносекундах, поэтому по ней определяется
+    дата изменений, не оставляющих следа в БД (удаление объектов,
+    изменение связанных объектов). Если версии в кэше ещё нет, она
+    создаётся с текущим временем.
+    """
+    return datetime.fromtimestamp(
+        max(get_cache_version(model) for model in models) / 10 ** 9,
+        tz=timezone.utc,
+    )
+
+
+def bump_cache_version(*models):
+    """Смена версии кэша моделей, делающая прежние записи недоступными.
+
+    Новая версия — текущее время в наносекундах (но не меньше прежней
+    версии, увеличенной на единицу), поэтому после вытеснения ключа
+    из кэша версии не повторяются, а get_cache_version_time возвращает
+    время смены.
+    """
+    for model in models:
+        key = VERSION_KEY_TEMPLATE.format(label=model._meta.label_lower)
+        version = cache.get(key) or 0
+        cache.set(key, max(time.time_ns(), version + 1), timeout=None)
+
+
+def get_ids_by_slugs(model, slugs):
+    """Словарь {слаг: ID} для существующих объектов модели.
+
+    Найденные ID кэшируются с версией модели, поэтому изменение
+    или удаление объекта сразу делает прежние записи недоступными.
+    Не найденные в кэше слаги загружаются одним запросом slug__in.
+    """
+    slugs = {slug for slug in slugs if slug_re.match(slug)}
+    if not slugs:
+        return {}
+    label = model._meta.label_lower
+    version = get_cache_version(model)
+    keys = {
+        SLUG_KEY_TEMPLATE.format(label=label, version=version, slug=slug):
+        slug for slug in slugs
+    }
+    ids = {keys[key]: pk for key, pk in cache.get_many(keys).items()}
+    missing = slugs - ids.keys()
+    if missing:
+        found = dict(model.objects.filter(
+            slug__in=missing).order_by().values_list('slug', 'id'))
+        cache.set_many({
+            SLUG_KEY_TEMPLATE.format(
+                label=label, version=version, slug=slug): pk
+            for slug, pk in found.items()
+        }, settings.CATALOG_CACHE_TIMEOUT)
+        ids.update(found)
+    return ids
@@ -1,14 +1,113 @@
-from django_filters.rest_framework import Filter, FilterSet
+from django.db.models import Exists, OuterRef
+from django_filters.rest_framework import (
+    BaseInFilter, BaseRangeFilter, CharFilter, Filter, FilterSet,
+    NumberFilter
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
 
-from reviews.models import Title
+from .cache import get_ids_by_slugs
+from reviews.models import Category, Genre, Title
+from reviews.search import get_search_terms, search_titles
+
+GenreTitle = Title.genre.through
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    """Фильтр по списку значений через запятую."""
+
+
+class NumberRangeFilter(BaseRangeFilter, NumberFilter):
+    """Фильтр по диапазону чисел вида «от,до»."""
 
 
 class TitleFilter(FilterSet):
-    """Фильтр для TitleViewSet."""
-    category = Filter(field_name='category__slug', lookup_expr='icontains')
-    genre = Filter(field_name='genre__slug', lookup_expr='icontains')
+    """Фильтр для TitleViewSet.
+
+    category и genre принимают точные слаги через запятую: слаги
+    заменяются на ID (с кэшированием), и фильтрация идёт по внешнему
+    ключу и подзапросом EXISTS без JOIN. Поиск по части слага доступен
+    явно через category__icontains и genre__icontains.
+    """
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    category__icontains = Filter(
+        field_name='category__slug', lookup_expr='icontains')
+    genre__icontains = CharFilter(method='filter_genre_icontains')
     name = Filter(lookup_expr='icontains')
+    year__range = NumberRangeFilter(field_name='year', lookup_expr='range')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_category(self, queryset, name, value):
+        ids = get_ids_by_slugs(Category, value)
+        return queryset.filter(category_id__in=ids.values())
+
+    def filter_genre(self, queryset, name, value):
+        ids = get_ids_by_slugs(Genre, value)
+        return queryset.filter(Exists(GenreTitle.objects.filter(
+            title_id=OuterRef('pk'), genre_id__in=ids.values())))
+
+    def filter_genre_icontains(self, queryset, name, value):
+        return queryset.filter(Exists(GenreTitle.objects.filter(
+            title_id=OuterRef('pk'), genre__slug__icontains=value)))
+
+
+class TitleSearchFilter(SearchFilter):
+    """Полнотекстовый поиск произведений с сортировкой по релевантности.
+
+    Если СУБД не поддерживает полнотекстовый поиск, используется
+    обычный поиск по search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = get_search_terms(
+            request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        result = search_titles(queryset, terms)
+        if result is None:
+            return super().filter_queryset(request, queryset, view)
+        return result
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """Сортировка произведений по параметру ordering.
+
+    Каждому значению соответствует сортировка с ID для однозначности,
+    которую целиком обслуживает один индекс Title, поэтому страница
+    выбирается просмотром диапазона индекса. Рейтинг берётся из
+    сохранённых столбцов и учитывает части счётчиков после переноса
+    командой compact_ratings; произведения без оценок при сортировке
+    по средней оценке идут последними в обоих направлениях, а по
+    байесовскому рейтингу — наравне со средней оценкой по умолчанию
+    (RATING_PRIOR_MEAN). Без параметра сохраняется сортировка
+    queryset (или по релевантности при поиске).
+    """
+    orderings = {
+        'rating': ('-is_rated', 'rating_avg', '-id'),
+        '-rating': ('-rating_avg', 'id'),
+        'weighted_rating': ('rating_weighted', '-id'),
+        '-weighted_rating': ('-rating_weighted', 'id'),
+        'year': ('year', '-id'),
+        '-year': ('-year', 'id'),
+        'name': ('name', 'id'),
+        '-name': ('-name', '-id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param, '').strip()
+        if not value:
+            return None
+        if value not in self.orderings:
+            raise ValidationError({self.ordering_param: [
+                f'Допустимые значения: {", ".join(self.orderings)}.']})
+        return self.orderings[value]
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering:
+            return queryset.order_by(*ordering)
+        return queryset
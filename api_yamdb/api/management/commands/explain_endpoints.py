@@ -0,0 +1,120 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import Http404
+from django.test import RequestFactory
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
+
+from api.urls import v1_router
+from reviews.models import Review, Title
+
+# Строки плана с полным просмотром таблицы и сортировкой без индекса.
+WARNING_PATTERNS = {
+    'sqlite': re.compile(
+        r'\bSCAN (?!.*\bUSING (COVERING )?INDEX\b)|USE TEMP B-TREE'),
+    'postgresql': re.compile(r'\bSeq Scan\b|\bSort\b'),
+}
+# На маленьких таблицах PostgreSQL предпочитает полный просмотр, поэтому
+# он отключается: в плане остаётся, только если подходящего индекса нет.
+POSTGRESQL_SETTINGS = (
+    'SET LOCAL enable_seqscan = off',
+    'SET LOCAL enable_sort = off',
+)
+URL_KWARG_RE = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+class Command(BaseCommand):
+    help = ('Выводит планы выполнения (EXPLAIN) запросов списков и объектов '
+            'API и отмечает полные просмотры таблиц и сортировки без '
+            'индекса')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Завершиться с ошибкой, если найдены отмеченные планы.',
+        )
+
+    def handle(self, *args, **options):
+        pattern = WARNING_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(
+                f'СУБД {connection.vendor} не поддерживается.')
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    for sql in POSTGRESQL_SETTINGS:
+                        cursor.execute(sql)
+            warnings = self.explain_endpoints(pattern)
+        if options['check'] and warnings:
+            raise CommandError(
+                f'Полные просмотры или сортировки без индекса: {warnings}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Отмеченных строк плана: {warnings}.'))
+
+    def explain_endpoints(self, pattern):
+        """Вывод планов запросов и подсчёт отмеченных строк."""
+        warnings = 0
+        for prefix, viewset, _ in v1_router.registry:
+            kwargs = self.get_url_kwargs(prefix)
+            path = '/api/v1/{}/'.format(URL_KWARG_RE.sub(
+                lambda match: str(kwargs[match.group(1)]), prefix))
+            for action, queryset in self.get_querysets(viewset, path,
+                                                       kwargs):
+                self.stdout.write(f'GET {path} ({action})')
+                if queryset is None:
+                    self.stdout.write('  нет данных для построения запроса')
+                    continue
+                for line in queryset.explain().splitlines():
+                    if pattern.search(line):
+                        warnings += 1
+                        self.stdout.write(self.style.WARNING(f'! {line}'))
+                    else:
+                        self.stdout.write(f'  {line}')
+        return warnings
+
+    def get_url_kwargs(self, prefix):
+        """Значения параметров URL вложенных ресурсов из существующих
+        объектов."""
+        names = URL_KWARG_RE.findall(prefix)
+        if 'review_id' in names:
+            title_id, review_id = Review.objects.values_list(
+                'title_id', 'pk').first() or (0, 0)
+            return {'title_id': title_id, 'review_id': review_id}
+        if 'title_id' in names:
+            return {'title_id': Title.objects.values_list(
+                'pk', flat=True).first() or 0}
+        return {}
+
+    def get_view(self, viewset, action, path, kwargs):
+        """Экземпляр ViewSet, подготовленный как для обработки запроса."""
+        view = viewset(action_map={'get': action})
+        view.action = action
+        view.args = ()
+        view.kwargs = dict(kwargs)
+        view.format_kwarg = None
+        view.request = view.initialize_request(RequestFactory().get(path))
+        return view
+
+    def get_querysets(self, viewset, path, kwargs):
+        """Запросы страницы списка и объекта в том виде, в котором их
+        выполняют действия list и retrieve."""
+        for action in ('list', 'retrieve'):
+            if not hasattr(viewset, action):
+                continue
+            view = self.get_view(viewset, action, path, kwargs)
+            try:
+                queryset = view.filter_queryset(view.get_queryset())
+            except (Http404, NotFound):
+                yield action, None
+                continue
+            if action == 'list':
+                yield action, queryset[:api_settings.PAGE_SIZE]
+                continue
+            lookup_field = view.lookup_field
+            value = queryset.values_list(
+                lookup_field, flat=True).first() or 0
+            # Как и QuerySet.get() в get_object(), без сортировки.
+            yield action, queryset.filter(**{lookup_field: value}).order_by()
@@ -0,0 +1,231 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import get_cache_version
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (курсору) без COUNT(*) и OFFSET.
+
+    Позиция задаётся значениями полей сортировки view.keyset_ordering
+    у последнего (или первого) объекта страницы, поэтому запрос любой
+    страницы сводится к поиску по индексу.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Получение страницы, следующей за позицией из курсора."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.keyset_ordering)
+        position, self.reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    @staticmethod
+    def invert(field):
+        """Смена направления сортировки поля."""
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """Условие «строго после позиции» для составного ключа сортировки.
+
+        Нестрогая граница по первому полю позволяет БД начать поиск
+        по индексу сразу с нужной позиции.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first, value = ordering[0], position[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': value}) & condition
+
+    def get_position(self, instance):
+        """Значения полей сортировки объекта для записи в курсор."""
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    @staticmethod
+    def encode_cursor(position, reverse=False):
+        """Кодирование позиции и направления в строку курсора."""
+        data = json.dumps({'p': position, 'r': int(reverse)})
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        """Получение позиции и направления из параметров запроса.
+
+        Значения позиции приводятся к типам полей сортировки модели,
+        поэтому курсор с неверными значениями даёт ответ 404, а не
+        ошибку БД или пустую страницу.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = data['p'], bool(data['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.get_ordering_field(model, field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def get_ordering_field(model, field):
+        """Поле модели, по которому выполняется сортировка field.
+
+        Для вычисляемых полей (GeneratedField) возвращается поле
+        с типом результата.
+        """
+        model_field = model._meta.get_field(field.lstrip('-'))
+        return getattr(model_field, 'output_field', model_field)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = self.encode_cursor(
+            self.get_position(self.page[0]), reverse=True)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {
+                    'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий общее количество объектов из кэша.
+
+    Ключ кэша строится по SQL-запросу и версии кэша модели, которая
+    меняется при создании и удалении объектов через API.
+    """
+
+    def get_count_cache_key(self):
+        """Ключ кэша для количества объектов в object_list."""
+        queryset = self.object_list
+        sql, params = queryset.query.sql_with_params()
+        signature = hashlib.md5(
+            f'{sql}{params!r}'.encode(), usedforsecurity=False).hexdigest()
+        label = queryset.model._meta.label_lower
+        version = get_cache_version(queryset.model)
+        return f'count:{label}:{version}:{signature}'
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        try:
+            key = self.get_count_cache_key()
+        except EmptyResultSet:
+            # Условие заведомо ложно (например, id__in=[]), запрос не нужен.
+            return 0
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """Постраничная пагинация с переключением на пагинацию по курсору.
+
+    В постраничном режиме количество объектов берётся из кэша. Режим
+    по курсору включается параметром pagination=cursor (или наличием
+    параметра cursor) у view с атрибутом keyset_ordering.
+    """
+    django_paginator_class = CachedCountPaginator
+    pagination_query_param = 'pagination'
+    keyset_pagination_class = KeysetPagination
+
+    def use_keyset(self, request, view):
+        """Проверка, запрошена ли пагинация по курсору."""
+        if not getattr(view, 'keyset_ordering', None):
+            return False
+        params = request.query_params
+        return (params.get(self.pagination_query_param) == 'cursor'
+                or self.keyset_pagination_class.cursor_query_param in params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
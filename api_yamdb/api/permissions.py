@@ -24,6 +24,6 @@ class IsAuthorOrModeratorOrReadOnly(BasePermission):
         user = request.user
         return (
             request.method in SAFE_METHODS
-            or obj.author == user
+            or obj.author_id == user.pk
             or user.is_authenticated and (user.is_moderator or user.is_admin)
         )
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator as token
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import UserClaimsAccessToken
 from reviews.models import Category, Comment, Genre, Review, Title
 from users import constants
+from users.outbox import queue_mail
 from users.validators import validate_username
 
 User = get_user_model()
@@ -20,28 +22,50 @@ class SignUpSerializer(serializers.Serializer):
     )
     email = serializers.EmailField(max_length=constants.EMAIL_FIELD_MAX_LENGTH)
 
+    def get_conflicts(self, username, email):
+        """Пользователь с такими username и email и ошибки для полей,
+        занятых другими пользователями, по одному запросу к БД."""
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        errors = {}
+        for user in users:
+            if user.username == username and user.email == email:
+                return user, {}
+            if user.username == username:
+                errors['username'] = (
+                    'Пользователь с таким username уже существует.')
+            else:
+                errors['email'] = (
+                    'Пользователь с таким email уже существует.')
+        return None, errors
+
     def validate(self, attrs):
         """Валидация регистрационных данных."""
-        username = attrs.get('username')
-        user_with_username = User.objects.filter(
-            username=username).first()
-        user_with_email = User.objects.filter(
-            email=attrs.get('email')).first()
-        if user_with_username != user_with_email:
-            message = {}
-            if user_with_username:
-                message.update({'username': (
-                    'Пользователь с таким username уже существует.')})
-            if user_with_email:
-                message.update({'email': (
-                    'Пользователь с таким email уже существует.')})
-            raise serializers.ValidationError(message)
+        self.user, errors = self.get_conflicts(
+            attrs.get('username'), attrs.get('email'))
+        if errors:
+            raise serializers.ValidationError(errors)
         return attrs
 
     def create(self, validated_data):
-        """Регистрация нового пользователя и отправка кода подтверждения."""
-        user, _ = User.objects.get_or_create(**validated_data)
-        send_mail(
+        """Регистрация нового пользователя и отправка кода подтверждения.
+
+        Если пользователь с теми же данными зарегистрировался
+        одновременно с этим запросом, нарушение уникальности при вставке
+        разбирается так же, как при валидации, вместо ошибки сервера.
+        """
+        user = self.user
+        if user is None:
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(**validated_data)
+            except IntegrityError:
+                user, errors = self.get_conflicts(
+                    validated_data['username'], validated_data['email'])
+                if user is None:
+                    raise serializers.ValidationError(errors or (
+                        'Не удалось зарегистрировать пользователя, '
+                        'повторите запрос.'))
+        queue_mail(
             subject='Confirmation code',
             message=(f'\t{user.username},\nВаш код подтверждения '
                      f'для получения токена YaMDb: {token.make_token(user)}'),
@@ -70,7 +94,7 @@ class TokenSerializer(serializers.Serializer):
 
     def to_representation(self, instance):
         """Отправка токена доступа."""
-        return {'token': str(AccessToken.for_user(instance))}
+        return {'token': str(UserClaimsAccessToken.for_user(instance))}
 
 
 class AdminSerializer(serializers.ModelSerializer):
@@ -114,24 +138,136 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
+class TitleListSerializer(serializers.ListSerializer):
+    """Сериалайзер для пакетного создания произведений.
+
+    Категории и жанры всех элементов загружаются двумя запросами до
+    проверки элементов, а произведения и их связи с жанрами
+    записываются двумя вставками в одной транзакции.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.catalog = self.load_catalog(data)
+        return super().to_internal_value(data)
+
+    @staticmethod
+    def load_catalog(data):
+        """Категории и жанры, упомянутые в элементах, по слагам."""
+        slugs = {Category: set(), Genre: set()}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get('category'), str):
+                slugs[Category].add(item['category'])
+            if isinstance(item.get('genre'), list):
+                slugs[Genre].update(
+                    slug for slug in item['genre'] if isinstance(slug, str))
+        return {
+            model: {
+                obj.slug: obj
+                for obj in model.objects.filter(slug__in=model_slugs)
+            } if model_slugs else {}
+            for model, model_slugs in slugs.items()
+        }
+
+    def create(self, validated_data):
+        genres = [item.pop('genre') for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            self.child.add_genres(zip(titles, genres))
+        for title, title_genres in zip(titles, genres):
+            self.child.cache_genres(title, title_genres)
+        return titles
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
-    """Сериалайзер для модели Title при небезопасных запросах."""
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        many=True,
-        allow_null=False,
+    """Сериалайзер для модели Title при небезопасных запросах.
+
+    Жанры и категория по слагам загружаются одним запросом каждые,
+    связи с жанрами записываются одной вставкой, а ответ строится
+    по объектам в памяти, поэтому количество запросов не зависит
+    от количества жанров.
+    """
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
         allow_empty=False,
-        queryset=Genre.objects.all()
-    )
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Category.objects.all()
     )
+    category = serializers.SlugField()
 
     class Meta:
         model = Title
         fields = (
             'id', 'name', 'year', 'description', 'genre', 'category')
+        list_serializer_class = TitleListSerializer
+
+    def get_catalog_objects(self, model, slugs):
+        """Объекты категорий или жанров по слагам: из загруженных
+        TitleListSerializer для всего пакета или одним запросом."""
+        catalog = getattr(self.parent, 'catalog', None)
+        if catalog is not None:
+            return catalog[model]
+        return {obj.slug: obj for obj in model.objects.filter(slug__in=slugs)}
+
+    def validate_category(self, slug):
+        category = self.get_catalog_objects(Category, [slug]).get(slug)
+        if category is None:
+            raise serializers.ValidationError(
+                f'Категория не существует: {slug}.')
+        return category
+
+    def validate_genre(self, slugs):
+        """Получение жанров по слагам с перечислением всех
+        несуществующих."""
+        slugs = list(dict.fromkeys(slugs))
+        genres = self.get_catalog_objects(Genre, slugs)
+        unknown = [slug for slug in slugs if slug not in genres]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Жанры не существуют: {", ".join(unknown)}.')
+        return [genres[slug] for slug in slugs]
+
+    @staticmethod
+    def add_genres(title_genres):
+        """Запись связей произведений с жанрами одной вставкой."""
+        GenreTitle = Title.genre.through
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre.pk)
+            for title, genres in title_genres
+            for genre in genres
+        )
+
+    @staticmethod
+    def cache_genres(title, genres):
+        """Заполнение кэша prefetch_related жанрами произведения."""
+        queryset = title.genre.all()
+        queryset._result_cache = sorted(genres, key=lambda genre: genre.slug)
+        queryset._prefetch_done = True
+        title._prefetched_objects_cache = {
+            **getattr(title, '_prefetched_objects_cache', {}),
+            'genre': queryset,
+        }
+
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = super().create(validated_data)
+            self.add_genres([(title, genres)])
+        self.cache_genres(title, genres)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genres is not None:
+                Title.genre.through.objects.filter(
+                    title_id=instance.pk).delete()
+                self.add_genres([(instance, genres)])
+        if genres is not None:
+            self.cache_genres(instance, genres)
+        return instance
 
     def to_representation(self, instance):
         """Вывод жанра и категории в качестве объектов в ответе."""
@@ -139,34 +275,58 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
+class AuthorField(serializers.SlugRelatedField):
+    """Имя автора объекта.
+
+    Для объектов текущего пользователя имя берётся из запроса, если
+    автор не загружен, чтобы не загружать его из БД.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, slug_field='username', **kwargs)
+
+    def get_attribute(self, instance):
+        user = getattr(self.context.get('request'), 'user', None)
+        if (user is not None and instance.author_id == user.pk
+                and not type(instance).author.is_cached(instance)):
+            return user
+        return super().get_attribute(instance)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Review."""
-    author = serializers.SlugRelatedField(read_only=True,
-                                          slug_field='username')
+    author = AuthorField()
 
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        """Проверка на уникальность отзыва."""
-        if self.context['request'].method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            author = self.context['request'].user.id
-            if Review.objects.filter(
-                    title_id=title_id,
-                    author=author
+    def create(self, validated_data):
+        """Создание отзыва с проверкой уникальности ограничением
+        unique_review в БД.
+
+        Вставка выполняется в точке сохранения, поэтому нарушение
+        ограничения не прерывает внешнюю транзакцию (ATOMIC_REQUESTS)
+        и вместо ошибки сервера возвращается ответ со статусом 400.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title_id=validated_data['title_id'],
+                    author_id=validated_data['author_id'],
             ).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставили отзыв на это произведение.'
-                )
-        return data
+                raise
+        raise serializers.ValidationError(
+            {'non_field_errors': [
+                'Вы уже оставили отзыв на это произведение.']}
+        )
 
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Comment."""
-    author = serializers.SlugRelatedField(read_only=True,
-                                          slug_field='username')
+    author = AuthorField()
 
     class Meta:
         model = Comment
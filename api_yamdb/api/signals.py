@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import USER_CLAIMS, revoke_user_tokens, user_cache
+from .cache import bump_cache_version
+from reviews.models import Category, Genre, Title
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Сброс кэша списков категорий и жанров при любом изменении,
+    в том числе через админ-зону."""
+    bump_cache_version(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users_cache(sender, instance, **kwargs):
+    """Смена версии пользователей (имена авторов входят в ответы
+    об отзывах и комментариях) и сброс пользователя в кэше
+    аутентификации."""
+    bump_cache_version(sender)
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def invalidate_titles_cache(sender, **kwargs):
+    """Смена версии произведений при удалении, в том числе через
+    админ-зону: удаление не меняет даты изменения оставшихся записей."""
+    bump_cache_version(sender)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_change(sender, instance, created, **kwargs):
+    """Отзыв токенов пользователя при изменении данных, записанных
+    в токен, или при блокировке."""
+    fields = (*USER_CLAIMS, 'is_active')
+    loaded = getattr(instance, '_loaded_values', {})
+    if not created and any(
+        field not in loaded or loaded[field] != getattr(instance, field)
+        for field in fields
+    ):
+        # Время отзыва записывается и в объект, чтобы повторное
+        # сохранение объекта не вернуло прежнее значение.
+        instance.tokens_valid_after = revoke_user_tokens(instance.pk)
+    instance._loaded_values = {
+        field: instance.__dict__[field]
+        for field in fields if field in instance.__dict__
+    }
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
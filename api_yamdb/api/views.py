@@ -1,23 +1,40 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters import rest_framework as filters
 from rest_framework import mixins, status, permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
-from django.db.models import Avg
 
 from . import serializers
-from .base_viewsets import CategoryGenreViewSet
-from .filters import TitleFilter
+from .base_viewsets import (
+    CategoryGenreViewSet, ConditionalGetMixin, CountCacheInvalidationMixin,
+    QueryPlanMixin
+)
+from .cache import get_cache_version, get_cache_version_time
+from .filters import TitleFilter, TitleOrderingFilter, TitleSearchFilter
+from .parsers import NDJSONParser
 from .permissions import IsAuthorOrModeratorOrReadOnly, IsAdminOrReadOnly
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import (
+    annotate_rating, annotate_rating_modified, get_rating_modified
+)
 
 User = get_user_model()
 
 
+def latest(*dates):
+    """Наибольшая из дат, не равных None."""
+    return max(filter(None, dates), default=None)
+
+
 class APIToken(APIView):
     """View-класс для работы с токеном доступа."""
     permission_classes = (permissions.AllowAny,)
@@ -29,11 +46,13 @@ class APIToken(APIView):
         return Response(serializer.data, status.HTTP_200_OK)
 
 
-class SignUpViewSet(mixins.CreateModelMixin, GenericViewSet):
+class SignUpViewSet(CountCacheInvalidationMixin, mixins.CreateModelMixin,
+                    GenericViewSet):
     """ViewSet для регистрации и выдачи кода подтверждения."""
     serializer_class = serializers.SignUpSerializer
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny,)
+    count_cache_models = (User,)
 
     def create(self, request, *args, **kwargs):
         """Сериализация данных и отправка ответа с требуемым статус-кодом."""
@@ -44,15 +63,31 @@ class SignUpViewSet(mixins.CreateModelMixin, GenericViewSet):
         return Response(data, status.HTTP_200_OK)
 
 
-class AdminViewSet(ModelViewSet):
+class AdminViewSet(CountCacheInvalidationMixin, ModelViewSet):
     """ViewSet для работы администратора с моделями пользователей."""
     serializer_class = serializers.AdminSerializer
     queryset = User.objects.all()
+    count_cache_models = (User, Review, Comment)
     lookup_field = 'username'
     filter_backends = (SearchFilter,)
     search_fields = ('username',)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    def get_current_user(self):
+        """Текущий пользователь.
+
+        Для чтения подходит пользователь из запроса. Для изменения
+        пользователь всегда загружается из БД: пользователь из запроса
+        может быть восстановлен из токена или взят из кэша процесса
+        и содержать устаревшие поля (например, роль), которые иначе
+        были бы записаны обратно при сохранении.
+        """
+        user = self.request.user
+        if (self.request.method in permissions.SAFE_METHODS
+                and isinstance(user, User)):
+            return user
+        return get_object_or_404(User, pk=user.pk)
+
     @action(
         detail=False,
         methods=['GET', 'PATCH'],
@@ -60,90 +95,235 @@ class AdminViewSet(ModelViewSet):
     )
     def me(self, request):
         """Обработка запроса пользователя на работу с собственным профилем."""
+        user = self.get_current_user()
         if request.method == 'GET':
-            serializer = serializers.UserSerializer(request.user)
+            serializer = serializers.UserSerializer(user)
             return Response(serializer.data, status.HTTP_200_OK)
         serializer = serializers.UserSerializer(
-            request.user, data=request.data, partial=True)
+            user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, QueryPlanMixin,
+                    CountCacheInvalidationMixin, viewsets.ModelViewSet):
     """ViewSet для модели Review."""
+    queryset = Review.objects.all()
     serializer_class = serializers.ReviewSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrReadOnly)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    keyset_ordering = ('-pub_date', 'id')
+    count_cache_models = (Review, Comment)
+    query_plans = dict.fromkeys(
+        ('list', 'retrieve', 'partial_update', 'destroy'),
+        {
+            'select_related': ('author',),
+            'only': ('id', 'text', 'score', 'pub_date', 'modified',
+                     'title_id', 'author__username'),
+        }
+    )
+
+    @cached_property
+    def title_id(self):
+        """ID произведения из URL, существование которого проверено.
 
-    def get_title(self):
-        """Получение произведения."""
-        try:
-            return Title.objects.get(id=self.kwargs.get('title_id'))
-        except Title.DoesNotExist:
+        Проверка выполняется один раз за запрос.
+        """
+        title_id = self.kwargs.get('title_id')
+        if not Title.objects.filter(pk=title_id).exists():
             raise NotFound('Произведение с указанным ID не существует.')
+        return title_id
 
     def get_queryset(self):
         """Получение queryset для отзывов конкретного произведения."""
-        return self.get_title().reviews.all()
+        queryset = super().get_queryset()
+        if self.lookup_field in self.kwargs:
+            return queryset.filter(title_id=self.kwargs['title_id'])
+        return queryset.filter(title_id=self.title_id)
+
+    def get_conditional_validators(self, instance=None):
+        """Версия отзыва или списка отзывов по дате изменения отзыва
+        или произведения."""
+        if instance is not None:
+            modified = instance.modified
+        else:
+            modified = latest(*annotate_rating_modified(
+                Title.objects.filter(pk=self.kwargs['title_id'])
+            ).values_list('modified', 'rating_modified').first() or ())
+        if modified is None:
+            return None
+        return (f'{modified.isoformat()}:{get_cache_version(User)}',
+                latest(modified, get_cache_version_time(User)))
 
     def perform_create(self, serializer):
         """Создание отзыва с автоматическим указанием автора."""
-        title = self.get_title()
-        serializer.save(author=self.request.user, title_id=title.id)
+        serializer.save(author_id=self.request.user.pk,
+                        title_id=self.title_id)
+        self.invalidate_count_cache()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, QueryPlanMixin,
+                     CountCacheInvalidationMixin, viewsets.ModelViewSet):
     """ViewSet для модели Comment."""
+    queryset = Comment.objects.all()
     serializer_class = serializers.CommentSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           IsAuthorOrModeratorOrReadOnly)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    keyset_ordering = ('-pub_date', 'id')
+    count_cache_models = (Comment,)
+    query_plans = dict.fromkeys(
+        ('list', 'retrieve', 'partial_update', 'destroy'),
+        {
+            'select_related': ('author',),
+            'only': ('id', 'text', 'pub_date', 'review_id',
+                     'author__username'),
+        }
+    )
+
+    @cached_property
+    def review_id(self):
+        """ID отзыва из URL, существование которого проверено.
 
-    def get_review(self):
-        """Получение отзыва, к которому относится(-ятся) комментарий(-и)."""
-        try:
-            return Review.objects.get(id=self.kwargs.get('review_id'),
-                                      title__id=self.kwargs.get('title_id'))
-        except Review.DoesNotExist:
+        Проверка выполняется один раз за запрос.
+        """
+        review_id = self.kwargs.get('review_id')
+        if not Review.objects.filter(
+            pk=review_id, title_id=self.kwargs.get('title_id')
+        ).exists():
             raise NotFound(
                 'Отзыв или(и) произведение с указанными ID не существуют.')
+        return review_id
 
     def get_queryset(self):
         """Получение queryset для комментариев конкретного отзыва."""
-        return self.get_review().comments.all()
+        queryset = super().get_queryset()
+        if self.lookup_field in self.kwargs:
+            return queryset.filter(
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id'],
+            )
+        return queryset.filter(review_id=self.review_id)
+
+    def get_conditional_validators(self, instance=None):
+        """Версия комментария или списка комментариев по дате изменения
+        отзыва."""
+        modified = Review.objects.filter(
+            pk=self.kwargs['review_id'], title_id=self.kwargs['title_id']
+        ).values_list('modified', flat=True).first()
+        if modified is None:
+            return None
+        return (f'{modified.isoformat()}:{get_cache_version(User)}',
+                latest(modified, get_cache_version_time(User)))
 
     def perform_create(self, serializer):
         """Создание комментария с автоматическим указанием автора."""
-        review = self.get_review()
-        serializer.save(author=self.request.user, review_id=review.id)
+        serializer.save(author_id=self.request.user.pk,
+                        review_id=self.review_id)
+        self.invalidate_count_cache()
 
 
 class CategoryViewSet(CategoryGenreViewSet):
     """ViewSet для модели Category."""
     queryset = Category.objects.all()
     serializer_class = serializers.CategorySerializer
+    count_cache_models = (Category,)
 
 
 class GenreViewSet(CategoryGenreViewSet):
     """ViewSet для модели Genre."""
     queryset = Genre.objects.all()
     serializer_class = serializers.GenreSerializer
+    count_cache_models = (Genre,)
+
 
+class TitleViewSet(ConditionalGetMixin, QueryPlanMixin,
+                   CountCacheInvalidationMixin, viewsets.ModelViewSet):
+    """ViewSet для модели Title.
 
-class TitleViewSet(viewsets.ModelViewSet):
-    """ViewSet для модели Title."""
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')).order_by('-year', 'id')
+    POST-запрос со списком произведений (JSON-массив или NDJSON)
+    создаёт их пакетом: либо все, либо ни одного, с ошибками
+    по каждому элементу.
+    """
+    queryset = Title.objects.order_by('-year', 'id')
+    default_keyset_ordering = ('-year', 'id')
+    count_cache_models = (Title, Review, Comment)
+    query_plans = dict.fromkeys(
+        ('list', 'retrieve', 'partial_update'),
+        {
+            'select_related': ('category',),
+            'prefetch_related': ('genre',),
+        }
+    )
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.DjangoFilterBackend, SearchFilter)
+    filter_backends = (filters.DjangoFilterBackend, TitleSearchFilter,
+                       TitleOrderingFilter)
     filterset_class = TitleFilter
-    search_fields = ('name',)
+    search_fields = ('name', 'description')
     http_method_names = ('get', 'post', 'patch', 'delete')
+    parser_classes = (*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser)
 
     def get_serializer_class(self):
         """Получение сериалайзера в зависимости от типа запроса."""
         if self.action in ('list', 'retrieve'):
             return serializers.TitleReadSerializer
         return serializers.TitleWriteSerializer
+
+    def create(self, request, *args, **kwargs):
+        """Создание одного произведения или пакета произведений."""
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.TITLES_BULK_MAX_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @property
+    def keyset_ordering(self):
+        """Сортировка для пагинации по курсору: из параметра ordering
+        или по умолчанию."""
+        return TitleOrderingFilter().get_ordering(
+            self.request, None, self) or self.default_keyset_ordering
+
+    def get_queryset(self):
+        """Добавление рейтинга с учётом частей счётчиков, а для объекта —
+        и даты изменения частей для валидаторов кэша."""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'partial_update'):
+            queryset = annotate_rating(queryset)
+        if self.action == 'retrieve':
+            queryset = annotate_rating_modified(queryset)
+        return queryset
+
+    def get_conditional_validators(self, instance=None):
+        """Версия произведения или списка произведений по дате изменения
+        произведений и частей счётчиков рейтинга и версиям категорий
+        и жанров.
+
+        Удаление произведений учитывается версией кэша Title, поэтому
+        для списка достаточно MAX(modified) по индексам без подсчёта строк.
+        Дата последнего изменения учитывает и время смены версий.
+        """
+        catalog = f'{get_cache_version(Category)}:{get_cache_version(Genre)}'
+        if instance is not None:
+            modified = latest(instance.modified,
+                              getattr(instance, 'rating_modified', None))
+            return (f'{modified.isoformat()}:{catalog}',
+                    latest(modified, get_cache_version_time(Category, Genre)))
+        modified = latest(
+            Title.objects.aggregate(modified=Max('modified'))['modified'],
+            get_rating_modified(),
+        )
+        if modified is None:
+            return None
+        version = (f'{modified.isoformat()}:{get_cache_version(Title)}:'
+                   f'{catalog}')
+        return version, latest(
+            modified, get_cache_version_time(Title, Category, Genre))
@@ -1,6 +1,9 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -24,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
+    'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
 ]
@@ -61,11 +65,84 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
 # Database
+# Профиль БД задаётся переменной окружения DB_PROFILE:
+# sqlite (по умолчанию) — SQLite в режиме WAL для одного узла,
+# postgresql — PostgreSQL с постоянными соединениями или пулом соединений
+# (DB_POOL_MAX_SIZE, требуется psycopg[pool]).
+
+DB_PROFILE = os.getenv('DB_PROFILE', 'sqlite')
+
+# PRAGMA, выполняемые при открытии каждого соединения с SQLite
+# (reviews.signals.configure_sqlite_connection).
+# WAL позволяет читать во время записи; cache_size задаётся в КиБ
+# (отрицательное значение), busy_timeout — в миллисекундах, mmap_size —
+# в байтах.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+}
 
-DATABASES = {
+if DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # Тестовая БД в файле, а не в памяти: общий кэш базы в памяти
+            # блокирует таблицы между потоками без ожидания busy_timeout,
+            # и тесты конкурентных запросов завершались бы ошибкой.
+            'TEST': {
+                'NAME': os.getenv(
+                    'SQLITE_TEST_PATH', BASE_DIR / 'test_db.sqlite3'),
+            },
+            'OPTIONS': {
+                # Блокировка на запись берётся в начале транзакции, чтобы
+                # параллельные записи ждали busy_timeout, а не завершались
+                # ошибкой при повышении блокировки.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+elif DB_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.getenv('DB_POOL_MAX_SIZE'):
+        # Пул соединений не совместим с постоянными соединениями.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль БД DB_PROFILE={DB_PROFILE!r}.')
+
+
+# Cache
+# Для нескольких процессов следует указать общий кэш (Redis, Memcached),
+# например CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# и CACHE_LOCATION=redis://127.0.0.1:6379.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
@@ -93,18 +170,46 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.JWTAuthentication',
     ],
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrKeysetPagination',
     'PAGE_SIZE': 5,
 }
 
+# Время хранения в кэше общего количества объектов для пагинации, секунды.
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Время хранения в кэше списков категорий и жанров, секунды.
+CATALOG_CACHE_TIMEOUT = 60 * 15
+
+# Количество частей счётчиков рейтинга у произведения
+# (reviews.TitleRatingShard); 0 — оценки учитываются сразу в строке
+# произведения. Части имеет смысл включать на PostgreSQL, где
+# одновременные отзывы к одному произведению ждут блокировки его строки
+# (например, RATING_SHARDS=8, с периодическим запуском compact_ratings);
+# SQLite выполняет записи по одной, и части только добавляют запросы.
+RATING_SHARDS = int(os.getenv('RATING_SHARDS', 0))
+
+# Наибольшее количество произведений в одном пакетном POST-запросе
+# к /api/v1/titles/.
+TITLES_BULK_MAX_SIZE = int(os.getenv('TITLES_BULK_MAX_SIZE', 500))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'api.authentication.ClaimsUser',
 }
 
+# Кэш пользователей для аутентификации в памяти процесса: количество
+# записей (0 — кэш выключен) и время жизни записи, секунды.
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', 1024))
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Восстановление пользователя из данных токена доступа без запроса к БД
+# (api.authentication.JWTAuthentication).
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', '') == '1'
+
 # Internationalization
 
 LANGUAGE_CODE = 'en-us'
@@ -124,6 +229,17 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 DEFAULT_FROM_EMAIL = 'yamdb@example.com'
 
+# Очередь писем (users.outbox): при EMAIL_OUTBOX_ENABLED=1 письма с кодом
+# подтверждения сохраняются в БД и отправляются командой send_outbox.
+EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', '') == '1'
+# Количество попыток отправки письма до отметки о неудаче.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Задержка перед первой повторной попыткой и её предел, секунды.
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+# Время, на которое письмо закрепляется за обработчиком, секунды.
+EMAIL_OUTBOX_LEASE = 5 * 60
+
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
@@ -1,3 +1,7 @@
 SCORE_MIN_VALUE = 1
 SCORE_MAX_VALUE = 10
 CHAR_FIELD_MAX_LENGTH = 256
+# Априорные средняя оценка и число оценок для байесовского рейтинга:
+# у произведений с малым числом отзывов рейтинг смещён к средней.
+RATING_PRIOR_MEAN = (SCORE_MIN_VALUE + SCORE_MAX_VALUE) / 2
+RATING_PRIOR_WEIGHT = 10
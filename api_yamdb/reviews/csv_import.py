@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+import os
+import threading
+
+
+class CSVChunkReader:
+    """Чтение CSV-файла частями с учётом смещений в байтах.
+
+    Каждая часть содержит не более chunk_size записей и описывается
+    смещениями начала и конца, по которым чтение можно продолжить
+    с любой ранее записанной границы без повторного чтения файла.
+    """
+
+    def __init__(self, filepath, chunk_size):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        with open(filepath, 'rb') as file:
+            header = file.readline()
+            self.data_offset = file.tell()
+        self.fieldnames = next(csv.reader([header.decode('utf-8-sig')]))
+
+    def read_record(self, file):
+        """Чтение одной записи CSV, в том числе многострочной."""
+        record = b''
+        while line := file.readline():
+            record += line
+            if record.count(b'"') % 2 == 0:
+                return record
+        return record
+
+    def chunks(self, start=None, skip=None):
+        """Генератор частей (начало, конец, записи) начиная со смещения.
+
+        skip сопоставляет началу уже загруженной части её конец; такие
+        части пропускаются переходом к их концу без чтения.
+        """
+        skip = skip or {}
+        with open(self.filepath, 'rb') as file:
+            file.seek(self.data_offset if start is None else start)
+            while True:
+                offset = file.tell()
+                if offset in skip:
+                    file.seek(skip[offset])
+                    continue
+                records = []
+                while len(records) < self.chunk_size:
+                    record = self.read_record(file)
+                    if not record:
+                        break
+                    if record.strip():
+                        records.append(record)
+                if not records:
+                    return
+                yield offset, file.tell(), records
+
+    def parse(self, records):
+        """Преобразование записей части в словари по заголовку файла."""
+        text = b''.join(records).decode('utf-8')
+        return csv.DictReader(io.StringIO(text), fieldnames=self.fieldnames)
+
+
+class ImportCheckpoint:
+    """Контрольные точки загрузки CSV-файлов в JSON-файле.
+
+    Для каждого файла хранятся смещение, до которого все части
+    загружены, загруженные части после него и признак завершения.
+    Если файл изменился после записи контрольной точки, она игнорируется.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.state = json.load(file)
+
+    @staticmethod
+    def signature(filepath):
+        stat = os.stat(filepath)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get_state(self, filepath, data_offset=None):
+        """Состояние загрузки файла; создаётся заново, если файл изменился."""
+        name = os.path.basename(filepath)
+        signature = self.signature(filepath)
+        with self.lock:
+            state = self.state.get(name)
+            if state is None or state['signature'] != signature:
+                state = self.state[name] = {
+                    'signature': signature,
+                    'offset': data_offset,
+                    'chunks': {},
+                    'complete': False,
+                }
+            return state
+
+    def is_complete(self, filepath):
+        return self.get_state(filepath)['complete']
+
+    def start(self, filepath, data_offset):
+        """Смещение для продолжения чтения и загруженные после него части."""
+        state = self.get_state(filepath, data_offset)
+        with self.lock:
+            if state['offset'] is None:
+                state['offset'] = data_offset
+            chunks = {
+                int(start): end for start, end in state['chunks'].items()}
+            return state['offset'], chunks
+
+    def chunk_done(self, filepath, start, end):
+        """Отметка о загрузке части и сдвиг непрерывно загруженного начала."""
+        state = self.get_state(filepath)
+        with self.lock:
+            chunks = state['chunks']
+            chunks[str(start)] = end
+            while str(state['offset']) in chunks:
+                state['offset'] = chunks.pop(str(state['offset']))
+            self.save()
+
+    def file_done(self, filepath):
+        state = self.get_state(filepath)
+        with self.lock:
+            state['complete'] = True
+            self.save()
+
+    def save(self):
+        """Атомарная запись контрольных точек на диск."""
+        if not self.path:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import compact_ratings
+
+
+class Command(BaseCommand):
+    help = ('Переносит накопленные части счётчиков рейтинга в рейтинг '
+            'произведений')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, обрабатываемых в одной '
+                 'транзакции.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Пауза между переносами, секунды.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить перенос один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            compacted = compact_ratings(options['batch_size'])
+            self.stdout.write(
+                f'Части счётчиков перенесены для произведений: {compacted}.')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -1,97 +1,324 @@
-import csv
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
 
+from reviews.csv_import import CSVChunkReader, ImportCheckpoint
 from reviews.models import Category, Genre, Title, Review, Comment
+from reviews.ratings import rebuild_ratings
 
 User = get_user_model()
+GenreTitle = Title.genre.through
 
 
 class Command(BaseCommand):
     help = 'Импортирует данные из CSV-файлов в базу данных через ORM'
 
+    # Файл, модель, метод создания объекта и файлы, от которых он зависит.
+    files = (
+        ('users.csv', User, 'build_user', ()),
+        ('category.csv', Category, 'build_category', ()),
+        ('genre.csv', Genre, 'build_genre', ()),
+        ('titles.csv', Title, 'build_title', ('category.csv',)),
+        ('genre_title.csv', GenreTitle, 'build_genre_title',
+         ('titles.csv', 'genre.csv')),
+        ('review.csv', Review, 'build_review', ('titles.csv', 'users.csv')),
+        ('comments.csv', Comment, 'build_comment',
+         ('review.csv', 'users.csv')),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одном INSERT внутри транзакции части '
+                 'файла.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Количество строк в части файла, загружаемой в отдельной '
+                 'транзакции. При ошибке сохранённые части остаются в БД; '
+                 'повторный запуск с тем же --checkpoint продолжает '
+                 'загрузку.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество потоков для параллельной загрузки частей.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='JSON-файл контрольных точек для продолжения прерванной '
+                 'загрузки.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Прочитать и проверить файлы, не сохраняя данные.',
+        )
+
     def handle(self, *args, **options):
-        data_dir = os.path.join(settings.BASE_DIR, 'static', 'data')
-
-        self.load_users(os.path.join(data_dir, 'users.csv'))
-        self.load_categories(os.path.join(data_dir, 'category.csv'))
-        self.load_genres(os.path.join(data_dir, 'genre.csv'))
-        self.load_titles(os.path.join(data_dir, 'titles.csv'))
-        self.load_genre_title(os.path.join(data_dir, 'genre_title.csv'))
-        self.load_reviews(os.path.join(data_dir, 'review.csv'))
-        self.load_comments(os.path.join(data_dir, 'comments.csv'))
-
-    def load_users(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                User.objects.get_or_create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row.get('role', 'user'),
-                    bio=row.get('bio', ''),
-                    first_name=row.get('first_name', ''),
-                    last_name=row.get('last_name', ''),
-                )
-
-    def load_categories(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                Category.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-
-    def load_genres(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                Genre.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-
-    def load_titles(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                category = Category.objects.get(id=row['category'])
-                Title.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=category
-                )
-
-    def load_genre_title(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                title = Title.objects.get(id=row['title_id'])
-                genre = Genre.objects.get(id=row['genre_id'])
-                title.genre.add(genre)
-
-    def load_reviews(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                Review.objects.get_or_create(
-                    id=row['id'],
-                    title=Title.objects.get(id=row['title_id']),
-                    text=row['text'],
-                    author=User.objects.get(id=row['author']),
-                    score=row['score'],
-                    pub_date=row['pub_date']
-                )
-
-    def load_comments(self, filepath):
-        with open(filepath, encoding='utf-8') as file:
-            for row in csv.DictReader(file):
-                Comment.objects.get_or_create(
-                    id=row['id'],
-                    review=Review.objects.get(id=row['review_id']),
-                    text=row['text'],
-                    author=User.objects.get(id=row['author']),
-                    pub_date=row['pub_date']
-                )
+        self.known_ids = {}
+        self.lock = threading.Lock()
+        self.batch_size = options['batch_size']
+        self.chunk_size = options['chunk_size']
+        self.workers = options['workers']
+        self.data_dir = options['data_dir']
+        if options['dry_run']:
+            if options['checkpoint']:
+                raise CommandError(
+                    'Пробный запуск не поддерживает контрольные точки.')
+            self.workers = 1
+            self.checkpoint = ImportCheckpoint(None)
+            with transaction.atomic():
+                self.import_files()
+                transaction.set_rollback(True)
+            self.stdout.write(self.style.WARNING(
+                'Пробный запуск: изменения отменены.'))
+            return
+        self.checkpoint = ImportCheckpoint(options['checkpoint'])
+        self.import_files()
+        self.reset_sequences()
+
+    def get_stages(self):
+        """Группы файлов, которые можно загружать одновременно.
+
+        Файл попадает в группу, когда загружены все файлы, от которых
+        он зависит.
+        """
+        pending = {spec[0]: spec for spec in self.files}
+        loaded = set()
+        stages = []
+        while pending:
+            stage = [spec for spec in pending.values()
+                     if set(spec[3]) <= loaded]
+            if not stage:
+                raise CommandError('Циклическая зависимость между файлами.')
+            for spec in stage:
+                del pending[spec[0]]
+            loaded.update(spec[0] for spec in stage)
+            stages.append(stage)
+        return stages
+
+    def import_files(self):
+        """Загрузка файлов по группам зависимостей."""
+        for stage in self.get_stages():
+            self.import_stage(stage)
+        rebuild_ratings()
+
+    def import_stage(self, stage):
+        """Загрузка группы независимых файлов частями.
+
+        При workers > 1 части загружаются пулом потоков, каждая часть
+        в отдельной транзакции и со своим соединением с БД.
+        """
+        models = {spec[0]: spec[1] for spec in self.files}
+        stats = {}
+        jobs = []
+        for filename, model, builder, dependencies in stage:
+            filepath = os.path.join(self.data_dir, filename)
+            for dependency in dependencies:
+                self.get_known_ids(models[dependency])
+            if self.checkpoint.is_complete(filepath):
+                self.stdout.write(f'{filename}: загружен ранее, пропущен')
+                continue
+            reader = CSVChunkReader(filepath, self.chunk_size)
+            start, skip = self.checkpoint.start(filepath, reader.data_offset)
+            stats[filename] = {'rows': 0, 'skipped': 0,
+                               'started': time.monotonic()}
+            jobs.append((filepath, model, getattr(self, builder), reader,
+                         reader.chunks(start, skip)))
+        if self.workers > 1:
+            with ThreadPoolExecutor(self.workers) as executor:
+                self.run_parallel(executor, jobs, stats)
+        else:
+            for filepath, model, build, reader, chunks in jobs:
+                for chunk in chunks:
+                    self.import_chunk(filepath, model, build, reader, chunk,
+                                      stats)
+        for filepath, model, *_ in jobs:
+            self.finish_file(filepath, model, stats)
+
+    def run_parallel(self, executor, jobs, stats):
+        """Чтение частей файлов по очереди и передача их в пул потоков.
+
+        Количество частей в обработке ограничено, чтобы не держать
+        в памяти весь файл.
+        """
+        in_flight = set()
+        for filepath, model, build, reader, chunks in jobs:
+            for chunk in chunks:
+                if len(in_flight) >= self.workers * 2:
+                    done, in_flight = wait(
+                        in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                in_flight.add(executor.submit(
+                    self.import_chunk_in_thread, filepath, model, build,
+                    reader, chunk, stats))
+        for future in wait(in_flight).done:
+            future.result()
+
+    def import_chunk_in_thread(self, *args):
+        try:
+            self.import_chunk(*args)
+        finally:
+            connection.close()
+
+    def import_chunk(self, filepath, model, build, reader, chunk, stats):
+        """Загрузка части файла в одной транзакции и запись контрольной
+        точки после её фиксации."""
+        start, end, records = chunk
+        rows = reader.parse(records)
+        objects = [obj for obj in map(build, rows) if obj is not None]
+        keys = {self.get_key(model, obj) for obj in objects}
+        with transaction.atomic():
+            existing = self.find_existing(model, keys)
+            model.objects.bulk_create(
+                objects, batch_size=self.batch_size, ignore_conflicts=True)
+            inserted = len(self.find_existing(model, keys) - existing)
+        self.checkpoint.chunk_done(filepath, start, end)
+        with self.lock:
+            file_stats = stats[os.path.basename(filepath)]
+            file_stats['rows'] += inserted
+            file_stats['skipped'] += len(records) - inserted
+
+    @staticmethod
+    def get_key(model, obj):
+        """Ключ строки: ID или, для жанров произведений, пара ID."""
+        if model is GenreTitle:
+            return int(obj.title_id), int(obj.genre_id)
+        return int(obj.pk)
+
+    def find_existing(self, model, keys):
+        """Ключи из keys, строки с которыми есть в БД.
+
+        ignore_conflicts пропускает строки, нарушающие ограничения
+        (повторные имена пользователей, отзывы, уже загруженные ID),
+        поэтому вставленные строки определяются сравнением ключей
+        до и после вставки.
+        """
+        keys = list(keys)
+        existing = set()
+        for index in range(0, len(keys), self.batch_size):
+            batch = keys[index:index + self.batch_size]
+            if model is GenreTitle:
+                found = model.objects.filter(
+                    title_id__in={title_id for title_id, _ in batch},
+                    genre_id__in={genre_id for _, genre_id in batch},
+                ).values_list('title_id', 'genre_id')
+            else:
+                found = model.objects.filter(
+                    pk__in=batch).values_list('pk', flat=True)
+            existing.update(found)
+        return existing & set(keys)
+
+    def finish_file(self, filepath, model, stats):
+        self.checkpoint.file_done(filepath)
+        self.known_ids.pop(model, None)
+        filename = os.path.basename(filepath)
+        file_stats = stats[filename]
+        elapsed = time.monotonic() - file_stats['started']
+        rows = file_stats['rows']
+        self.stdout.write(
+            f'{filename}: {rows} строк за {elapsed:.2f} с '
+            f'({rows / max(elapsed, 1e-6):.0f} строк/с), '
+            f'пропущено {file_stats["skipped"]}'
+        )
+
+    def get_known_ids(self, model):
+        """Множество ID модели для проверки внешних ключей без запросов
+        на каждую строку."""
+        with self.lock:
+            if model not in self.known_ids:
+                self.known_ids[model] = set(
+                    model.objects.values_list('id', flat=True))
+            return self.known_ids[model]
+
+    def check_ids(self, *references):
+        """Проверка существования объектов, на которые ссылается строка."""
+        for model, value in references:
+            known_ids = self.get_known_ids(model)
+            if not value.isdigit() or int(value) not in known_ids:
+                return False
+        return True
+
+    def reset_sequences(self):
+        """Синхронизация последовательностей ID после вставки с явными ID."""
+        models = [spec[1] for spec in self.files]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def build_user(self, row):
+        return User(
+            id=row['id'],
+            username=row['username'],
+            email=row['email'],
+            role=row.get('role', 'user'),
+            bio=row.get('bio', ''),
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+        )
+
+    def build_category(self, row):
+        return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+    def build_genre(self, row):
+        return Genre(id=row['id'], name=row['name'], slug=row['slug'])
+
+    def build_title(self, row):
+        if not self.check_ids((Category, row['category'])):
+            return None
+        return Title(
+            id=row['id'],
+            name=row['name'],
+            year=row['year'],
+            category_id=row['category'],
+        )
+
+    def build_genre_title(self, row):
+        if not self.check_ids((Title, row['title_id']),
+                              (Genre, row['genre_id'])):
+            return None
+        return GenreTitle(title_id=row['title_id'], genre_id=row['genre_id'])
+
+    def build_review(self, row):
+        if not self.check_ids((Title, row['title_id']),
+                              (User, row['author'])):
+            return None
+        return Review(
+            id=row['id'],
+            title_id=row['title_id'],
+            text=row['text'],
+            author_id=row['author'],
+            score=row['score'],
+            pub_date=row['pub_date'],
+        )
+
+    def build_comment(self, row):
+        if not self.check_ids((Review, row['review_id']),
+                              (User, row['author'])):
+            return None
+        return Comment(
+            id=row['id'],
+            review_id=row['review_id'],
+            text=row['text'],
+            author_id=row['author'],
+            pub_date=row['pub_date'],
+        )
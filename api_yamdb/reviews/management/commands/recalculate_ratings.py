@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.ratings import find_rating_drift, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги произведений по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не изменяя данные.',
+        )
+
+    def handle(self, *args, **options):
+        drift = find_rating_drift()
+        for title in drift:
+            self.stdout.write(
+                f'{title.pk} «{title.name}»: сохранено '
+                f'{title.total_rating_sum}/{title.total_rating_count}, '
+                f'фактически {title.actual_sum}/{title.actual_count}'
+            )
+        if options['check']:
+            if drift:
+                raise CommandError(
+                    f'Расхождения рейтинга у произведений: {len(drift)}.')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        updated = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для произведений: {updated}.'))
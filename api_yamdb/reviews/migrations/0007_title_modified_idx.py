@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['modified'], name='title_modified_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRatingShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(verbose_name='Номер части')),
+                ('rating_sum', models.IntegerField(default=0, verbose_name='Изменение суммы оценок')),
+                ('rating_count', models.IntegerField(default=0, verbose_name='Изменение количества оценок')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_shards', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Часть счётчиков рейтинга',
+                'verbose_name_plural': 'Части счётчиков рейтинга',
+                'indexes': [models.Index(fields=['modified'], name='rating_shard_modified_idx')],
+                'constraints': [models.UniqueConstraint(fields=('title', 'shard'), name='unique_title_rating_shard')],
+            },
+        ),
+    ]
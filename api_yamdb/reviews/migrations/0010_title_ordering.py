@@ -0,0 +1,56 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:29
+
+from importlib import import_module
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+title_search = import_module('reviews.migrations.0006_title_search')
+
+# SQLite добавляет вычисляемые столбцы пересозданием таблицы, при этом
+# удаляются триггеры полнотекстового поиска из 0006_title_search.
+SQLITE_TRIGGERS = (
+    *title_search.SQLITE_BACKWARD[:3], *title_search.SQLITE_FORWARD[1:4])
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_rating_shard'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, create_search_triggers),
+        migrations.AddField(
+            model_name='title',
+            name='rating_avg',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(rating_count=0, then=models.Value(0.0)), default=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('rating_sum', models.FloatField()), '/', models.F('rating_count'))), output_field=models.FloatField(), verbose_name='Средняя оценка'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_weighted',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Value(55.0), '+', django.db.models.functions.comparison.Cast('rating_sum', models.FloatField())), '/', django.db.models.expressions.CombinedExpression(models.Value(10), '+', models.F('rating_count'))), output_field=models.FloatField(), verbose_name='Байесовский рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating_avg', 'id'], name='title_rating_avg_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating_weighted', 'id'], name='title_rating_weighted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ),
+        migrations.RunPython(
+            create_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:53
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite добавляет вычисляемый столбец пересозданием таблицы и удаляет
+# триггеры полнотекстового поиска, поэтому они создаются заново.
+title_ordering = import_module('reviews.migrations.0010_title_ordering')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_ordering'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, title_ordering.create_search_triggers),
+        migrations.AddField(
+            model_name='title',
+            name='is_rated',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(rating_count=0, then=models.Value(False)), default=models.Value(True)), output_field=models.BooleanField(), verbose_name='Есть оценки'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-is_rated', 'rating_avg', '-id'], name='title_rated_rating_avg_id_idx'),
+        ),
+        migrations.RunPython(
+            title_ordering.create_search_triggers, migrations.RunPython.noop),
+    ]
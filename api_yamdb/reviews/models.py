@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Cast
 
 from . import constants
 from .validators import validate_year
@@ -32,11 +34,21 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения отзыва или комментариев к нему'
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', 'id')
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -47,6 +59,14 @@ class Review(models.Model):
     def __str__(self):
         return f'Отзыв {self.author} на {self.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминание оценки, загруженной из БД, для пересчёта рейтинга."""
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._loaded_rating = (loaded.get('title_id'), loaded.get('score'))
+        return instance
+
 
 class Comment(models.Model):
     """Модель комментария к отзыву."""
@@ -71,7 +91,13 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', 'id')
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author} к отзыву {self.review}'
@@ -127,11 +153,131 @@ class Title(models.Model):
         related_name='titles', null=True,
         verbose_name='Категория',
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения произведения или отзывов к нему',
+    )
+    # Ключи сортировки по сохранённым счётчикам (без частей счётчиков,
+    # ещё не перенесённых командой compact_ratings). У произведений без
+    # оценок rating_avg равен 0, поэтому при сортировке по убыванию они
+    # идут последними; при сортировке по возрастанию их переносит в конец
+    # is_rated. Столбцы не допускают NULL, что упрощает пагинацию
+    # по курсору.
+    is_rated = models.GeneratedField(
+        expression=Case(
+            When(rating_count=0, then=Value(False)),
+            default=Value(True),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        verbose_name='Есть оценки',
+    )
+    rating_avg = models.GeneratedField(
+        expression=Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=(Cast('rating_sum', models.FloatField())
+                     / F('rating_count')),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name='Средняя оценка',
+    )
+    rating_weighted = models.GeneratedField(
+        expression=(
+            (Value(constants.RATING_PRIOR_MEAN
+                   * constants.RATING_PRIOR_WEIGHT)
+             + Cast('rating_sum', models.FloatField()))
+            / (Value(constants.RATING_PRIOR_WEIGHT) + F('rating_count'))
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name='Байесовский рейтинг',
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year', 'id')
+        indexes = [
+            models.Index(fields=['-year', 'id'], name='title_year_id_idx'),
+            models.Index(fields=['modified'], name='title_modified_idx'),
+            models.Index(fields=['-rating_avg', 'id'],
+                         name='title_rating_avg_id_idx'),
+            models.Index(fields=['-is_rated', 'rating_avg', '-id'],
+                         name='title_rated_rating_avg_id_idx'),
+            models.Index(fields=['-rating_weighted', 'id'],
+                         name='title_rating_weighted_id_idx'),
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    @property
+    def rating(self):
+        """Средняя оценка произведения по сохранённым счётчикам.
+
+        Если queryset подготовлен reviews.ratings.annotate_rating,
+        учитываются и ещё не перенесённые части счётчиков.
+        """
+        rating_sum = getattr(self, 'total_rating_sum', self.rating_sum)
+        rating_count = getattr(self, 'total_rating_count', self.rating_count)
+        if not rating_count:
+            return None
+        return rating_sum // rating_count
+
+
+class TitleRatingShard(models.Model):
+    """Часть счётчиков рейтинга произведения.
+
+    Оценки отзывов учитываются в случайно выбранной части, чтобы
+    одновременные отзывы к одному произведению не ждали блокировки одной
+    строки. Команда compact_ratings переносит накопленные изменения
+    в счётчики произведения.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rating_shards',
+        verbose_name='Произведение',
+    )
+    shard = models.PositiveSmallIntegerField(verbose_name='Номер части')
+    rating_sum = models.IntegerField(
+        default=0,
+        verbose_name='Изменение суммы оценок',
+    )
+    rating_count = models.IntegerField(
+        default=0,
+        verbose_name='Изменение количества оценок',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Часть счётчиков рейтинга'
+        verbose_name_plural = 'Части счётчиков рейтинга'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'shard'],
+                name='unique_title_rating_shard'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['modified'],
+                         name='rating_shard_modified_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}:{self.shard}'
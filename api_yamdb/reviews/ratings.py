@@ -0,0 +1,213 @@
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case, Count, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Review, Title, TitleRatingShard
+
+
+def update_rating(title_id, score_delta=0, count_delta=0):
+    """Инкрементальное изменение рейтинга произведения.
+
+    При settings.RATING_SHARDS > 0 изменение записывается в случайную
+    часть счётчиков (TitleRatingShard), и одновременные отзывы к одному
+    произведению не блокируют строку произведения. Иначе изменяется
+    сохранённый рейтинг и дата изменения произведения. По дате изменения
+    произведения и его частей вычисляются валидаторы кэша для
+    произведения и его отзывов. Без изменения оценок (например, при
+    изменении текста отзыва) меняется только дата изменения
+    произведения: нулевая часть была бы удалена при переносе вместе
+    с датой своего изменения.
+    """
+    now = timezone.now()
+    if not score_delta and not count_delta:
+        Title.objects.filter(pk=title_id).update(modified=now)
+        return
+    if not settings.RATING_SHARDS:
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+            modified=now,
+        )
+        return
+    shard = random.randrange(settings.RATING_SHARDS)
+    queryset = TitleRatingShard.objects.filter(title_id=title_id, shard=shard)
+    values = {
+        'rating_sum': F('rating_sum') + score_delta,
+        'rating_count': F('rating_count') + count_delta,
+        'modified': now,
+    }
+    if queryset.update(**values):
+        return
+    try:
+        with transaction.atomic():
+            TitleRatingShard.objects.create(
+                title_id=title_id,
+                shard=shard,
+                rating_sum=score_delta,
+                rating_count=count_delta,
+            )
+    except IntegrityError:
+        # Часть создана одновременным отзывом.
+        queryset.update(**values)
+
+
+def get_shards(field, aggregate):
+    """Подзапрос агрегата по частям счётчиков произведения."""
+    shards = TitleRatingShard.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    return Subquery(
+        shards.annotate(total=aggregate(field)).values('total'))
+
+
+def annotate_rating(queryset):
+    """Добавление к queryset произведений счётчиков рейтинга с учётом
+    ещё не перенесённых частей."""
+    return queryset.annotate(
+        total_rating_sum=F('rating_sum') + Coalesce(
+            get_shards('rating_sum', Sum), 0),
+        total_rating_count=F('rating_count') + Coalesce(
+            get_shards('rating_count', Sum), 0),
+    )
+
+
+def annotate_rating_modified(queryset):
+    """Добавление к queryset произведений даты последнего изменения
+    частей счётчиков рейтинга."""
+    return queryset.annotate(
+        rating_modified=get_shards('modified', Max))
+
+
+def get_rating_modified():
+    """Дата последнего изменения частей счётчиков всех произведений."""
+    return TitleRatingShard.objects.aggregate(
+        modified=Max('modified'))['modified']
+
+
+def compact_ratings(batch_size=1000):
+    """Перенос накопленных частей счётчиков в рейтинг произведений.
+
+    Произведения обрабатываются пачками, все части произведения —
+    в одной транзакции. Перенесённые значения вычитаются из частей,
+    а не обнуляют их, поэтому оценки, учтённые одновременно с переносом,
+    не теряются; опустевшие части удаляются. Возвращает количество
+    произведений, части которых перенесены.
+    """
+    pending = TitleRatingShard.objects.exclude(
+        rating_sum=0, rating_count=0).order_by('title_id')
+    compacted = 0
+    last_title_id = 0
+    while True:
+        title_ids = list(pending.filter(
+            title_id__gt=last_title_id
+        ).values_list('title_id', flat=True).distinct()[:batch_size])
+        if not title_ids:
+            delete_zero_shards()
+            return compacted
+        with transaction.atomic():
+            shards = list(pending.filter(title_id__in=title_ids).values_list(
+                'pk', 'title_id', 'rating_sum', 'rating_count'))
+            totals = defaultdict(lambda: [0, 0])
+            for _, title_id, rating_sum, rating_count in shards:
+                totals[title_id][0] += rating_sum
+                totals[title_id][1] += rating_count
+            shard_ids = [pk for pk, *_ in shards]
+            TitleRatingShard.objects.filter(pk__in=shard_ids).update(
+                rating_sum=F('rating_sum') - Case(*(
+                    When(pk=pk, then=Value(rating_sum))
+                    for pk, _, rating_sum, _ in shards)),
+                rating_count=F('rating_count') - Case(*(
+                    When(pk=pk, then=Value(rating_count))
+                    for pk, _, _, rating_count in shards)),
+            )
+            # Дата изменения произведения сдвигается, так как удаление
+            # частей может уменьшить дату последнего изменения частей.
+            Title.objects.filter(pk__in=totals).update(
+                rating_sum=F('rating_sum') + Case(*(
+                    When(pk=title_id, then=Value(total[0]))
+                    for title_id, total in totals.items())),
+                rating_count=F('rating_count') + Case(*(
+                    When(pk=title_id, then=Value(total[1]))
+                    for title_id, total in totals.items())),
+                modified=timezone.now(),
+            )
+            TitleRatingShard.objects.filter(
+                pk__in=shard_ids, rating_sum=0, rating_count=0).delete()
+        compacted += len(totals)
+        last_title_id = title_ids[-1]
+
+
+def delete_zero_shards():
+    """Удаление частей, обнулённых отзывом и его удалением.
+
+    Переносить из них нечего, но удаление может уменьшить дату последнего
+    изменения частей, поэтому дата изменения их произведений сдвигается
+    в той же транзакции.
+    """
+    zero_shards = TitleRatingShard.objects.filter(
+        rating_sum=0, rating_count=0)
+    with transaction.atomic():
+        title_ids = set(zero_shards.values_list('title_id', flat=True))
+        if not title_ids:
+            return
+        Title.objects.filter(pk__in=title_ids).update(
+            modified=timezone.now())
+        zero_shards.filter(title_id__in=title_ids).delete()
+
+
+def annotate_actual_rating(queryset):
+    """Добавление к queryset произведений фактических сумм и числа оценок."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    return queryset.annotate(
+        actual_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        actual_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+    )
+
+
+def find_rating_drift(queryset=None):
+    """Произведения, у которых рейтинг с учётом частей счётчиков
+    расходится с отзывами."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    return annotate_actual_rating(annotate_rating(queryset)).filter(
+        ~Q(total_rating_sum=F('actual_sum'))
+        | ~Q(total_rating_count=F('actual_count'))
+    )
+
+
+def rebuild_ratings(queryset=None):
+    """Полный пересчёт сохранённого рейтинга по отзывам с удалением
+    частей счётчиков."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    with transaction.atomic():
+        TitleRatingShard.objects.filter(
+            title__in=queryset.values('pk')).delete()
+        return queryset.update(
+            rating_sum=Coalesce(
+                Subquery(
+                    reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(
+                    reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            modified=timezone.now(),
+        )
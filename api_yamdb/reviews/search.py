@@ -0,0 +1,50 @@
+import re
+
+from django.db import connection
+
+from .models import Title
+
+FTS_TABLE = f'{Title._meta.db_table}_fts'
+SEARCH_CONFIG = 'russian'
+# Вес совпадения в названии относительно совпадения в описании.
+NAME_WEIGHT = 10.0
+
+
+def get_search_terms(text):
+    """Слова поискового запроса без служебных символов FTS."""
+    return re.findall(r'\w+', text)
+
+
+def search_titles(queryset, terms):
+    """Полнотекстовый поиск произведений по названию и описанию.
+
+    Слова ищутся по префиксу, результаты упорядочиваются по
+    релевантности. На SQLite используется таблица FTS5, на PostgreSQL —
+    столбец tsvector с GIN-индексом. Возвращает None, если СУБД не
+    поддерживает полнотекстовый поиск.
+    """
+    table = Title._meta.db_table
+    if connection.vendor == 'sqlite':
+        query = ' '.join(f'"{term}"*' for term in terms)
+        queryset = queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE}, %s, 1.0)'},
+            select_params=(NAME_WEIGHT,),
+            tables=(FTS_TABLE,),
+            where=(f'{FTS_TABLE}.rowid = {table}.id',
+                   f'{FTS_TABLE} MATCH %s'),
+            params=(query,),
+        )
+        return queryset.order_by('search_rank', 'id')
+    if connection.vendor == 'postgresql':
+        query = ' & '.join(f'{term}:*' for term in terms)
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        queryset = queryset.extra(
+            select={
+                'search_rank': f'ts_rank({table}.search_vector, {tsquery})'
+            },
+            select_params=(query,),
+            where=(f'{table}.search_vector @@ {tsquery}',),
+            params=(query,),
+        )
+        return queryset.order_by('-search_rank', 'id')
+    return None
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Comment, Review, Title, User
+from .ratings import rebuild_ratings, update_rating
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учёт новой или изменённой оценки в рейтинге произведения."""
+    if created:
+        update_rating(instance.title_id, instance.score, 1)
+    else:
+        title_id, score = getattr(instance, '_loaded_rating', (None, None))
+        if score is None:
+            rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        elif title_id != instance.title_id:
+            update_rating(title_id, -score, -1)
+            update_rating(instance.title_id, instance.score, 1)
+        else:
+            update_rating(instance.title_id, instance.score - score)
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, origin=None, **kwargs):
+    """Исключение оценки удалённого отзыва, в том числе при каскадном
+    удалении автора.
+
+    При удалении самого произведения рейтинг не меняется: части его
+    счётчиков удаляются вместе с ним, а новая часть нарушила бы
+    внешний ключ.
+    """
+    if isinstance(origin, Title) and origin.pk == instance.title_id:
+        return
+    if isinstance(origin, QuerySet) and origin.model is Title:
+        return
+    update_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review(sender, instance, origin=None, **kwargs):
+    """Обновление даты изменения отзыва при изменении комментариев.
+
+    При каскадном удалении комментариев (вместе с отзывом, произведением
+    или автором) обработчик ничего не делает: отзывы удаляются вместе
+    с комментариями, а отзывы с комментариями удаляемого автора
+    обновляются одним запросом в touch_reviews_on_author_delete.
+    """
+    if origin is not None and not (
+        isinstance(origin, Comment)
+        or isinstance(origin, QuerySet) and origin.model is Comment
+    ):
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        modified=timezone.now())
+
+
+@receiver(pre_delete, sender=User)
+def touch_reviews_on_author_delete(sender, instance, **kwargs):
+    """Обновление даты изменения отзывов других авторов, комментарии
+    к которым удаляются вместе с автором."""
+    Review.objects.filter(comments__author=instance).exclude(
+        author=instance).update(modified=timezone.now())
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Применение settings.SQLITE_PRAGMAS к новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
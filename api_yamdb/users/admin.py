@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -9,3 +9,12 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    readonly_fields = ('created', 'sent_at', 'last_error')
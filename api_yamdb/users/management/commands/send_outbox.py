@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import (
+    DispatchMetrics, claim_batch, record_results, send_batch
+)
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками в несколько потоков '
+            'с повторными попытками')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Количество потоков отправки.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        self.metrics = DispatchMetrics()
+        self.verbosity = options['verbosity']
+        with ThreadPoolExecutor(options['workers']) as executor:
+            try:
+                self.dispatch(executor, options)
+            finally:
+                self.report()
+
+    def dispatch(self, executor, options):
+        """Выбор пачек писем из очереди и передача их в пул потоков.
+
+        Потоки только отправляют письма, а выбор пачек и запись
+        результатов выполняются в основном потоке, поэтому обращения к БД
+        не конкурируют между собой. Количество пачек в обработке
+        не превышает количества потоков.
+        """
+        in_flight = set()
+        while True:
+            if len(in_flight) >= options['workers']:
+                in_flight = self.wait_any(in_flight)
+                continue
+            emails = claim_batch(options['batch_size'])
+            if emails:
+                in_flight.add(executor.submit(send_batch, emails))
+            elif in_flight:
+                in_flight = self.wait_any(in_flight)
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['interval'])
+
+    def wait_any(self, futures):
+        """Ожидание отправки хотя бы одной пачки и запись результатов."""
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            record_results(*future.result(), self.metrics)
+            if self.verbosity > 1:
+                self.report()
+        return pending
+
+    def report(self):
+        metrics = self.metrics.snapshot()
+        self.stdout.write(
+            f'Пачек: {metrics["batches"]}, отправлено писем: '
+            f'{metrics["sent"]}, с ошибкой: {metrics["failed"]}, '
+            f'{metrics["rate"]:.1f} писем/с'
+        )
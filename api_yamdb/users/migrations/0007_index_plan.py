@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0006_alter_user_first_name_alter_user_last_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', 'id'], name='user_date_joined_id_idx'),
+        ),
+    ]
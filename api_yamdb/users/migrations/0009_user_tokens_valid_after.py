@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Время отзыва токенов'),
+        ),
+    ]
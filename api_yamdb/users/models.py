@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.mail import EmailMessage
 from django.db import models
+from django.utils import timezone
 
 from . import constants
 from .validators import validate_username
@@ -33,11 +35,31 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, verbose_name='О пользователе')
     role = models.SlugField(
         default=Roles.USER, choices=Roles.choices, verbose_name='Роль')
+    tokens_valid_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Время отзыва токенов',
+    )
 
     class Meta:
         ordering = ('-date_joined', 'id')
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+        indexes = [
+            models.Index(
+                fields=['-date_joined', 'id'],
+                name='user_date_joined_id_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминание загруженных из БД значений полей для сравнения
+        при сохранении."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     @property
     def is_admin(self):
@@ -50,3 +72,59 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.Roles.MODERATOR.value
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку."""
+    class Status(models.TextChoices):
+        PENDING = ('pending', 'Ожидает отправки')
+        SENT = ('sent', 'Отправлено')
+        FAILED = ('failed', 'Не отправлено')
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(
+        max_length=constants.EMAIL_FIELD_MAX_LENGTH,
+        blank=True,
+        verbose_name='Отправитель',
+    )
+    recipient = models.EmailField(
+        max_length=constants.EMAIL_FIELD_MAX_LENGTH,
+        verbose_name='Получатель',
+    )
+    status = models.SlugField(
+        default=Status.PENDING, choices=Status.choices,
+        verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки')
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания')
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Дата отправки')
+
+    class Meta:
+        ordering = ('created', 'id')
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_attempt_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
+
+    def to_message(self, connection=None):
+        """Письмо для отправки через почтовый бэкенд Django."""
+        return EmailMessage(
+            subject=self.subject,
+            body=self.message,
+            from_email=self.from_email or None,
+            to=[self.recipient],
+            connection=connection,
+        )
@@ -0,0 +1,154 @@
+"""Очередь исходящих писем.
+
+Если очередь включена (settings.EMAIL_OUTBOX_ENABLED), письма сохраняются
+в БД во время запроса и отправляются отдельным процессом командой
+send_outbox, поэтому время ответа не зависит от почтового сервера.
+Обработчик отправляет письма пачками, открывая одно соединение на пачку.
+"""
+import smtplib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# Ошибки почтового бэкенда, после которых отправка повторяется.
+DELIVERY_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def queue_mail(subject, message, recipient_list, from_email=None):
+    """Постановка письма в очередь или отправка сразу, если очередь
+    выключена."""
+    if not settings.EMAIL_OUTBOX_ENABLED:
+        return send_mail(subject, message, from_email, recipient_list)
+    return len(OutboxEmail.objects.bulk_create(
+        OutboxEmail(subject=subject, message=message,
+                    from_email=from_email or '', recipient=recipient)
+        for recipient in recipient_list
+    ))
+
+
+def claim_batch(size):
+    """Выбор писем, готовых к отправке.
+
+    Следующая попытка выбранных писем откладывается на время
+    EMAIL_OUTBOX_LEASE, чтобы другие обработчики их не взяли; если
+    обработчик завершится, не отправив письма, они вернутся в очередь.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now
+            ).order_by('next_attempt_at', 'id')[:size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_LEASE))
+    return emails
+
+
+def get_retry_delay(attempts):
+    """Задержка перед повторной отправкой, удваивающаяся с каждой
+    попыткой."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def mark_sent(emails):
+    """Отметка об отправке писем одним запросом."""
+    return OutboxEmail.objects.filter(
+        pk__in=[email.pk for email in emails]
+    ).update(
+        status=OutboxEmail.Status.SENT,
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+
+
+def mark_failed(email, error):
+    """Запись ошибки и планирование повторной попытки, пока не исчерпано
+    EMAIL_OUTBOX_MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.Status.FAILED
+    else:
+        email.next_attempt_at = (
+            timezone.now() + get_retry_delay(email.attempts))
+    email.save(update_fields=(
+        'status', 'attempts', 'last_error', 'next_attempt_at'))
+
+
+class DispatchMetrics:
+    """Счётчики отправки писем, общие для потоков обработчика."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.batches = 0
+        self.sent = 0
+        self.failed = 0
+
+    def add_batch(self, sent, failed):
+        with self.lock:
+            self.batches += 1
+            self.sent += sent
+            self.failed += failed
+
+    def snapshot(self):
+        """Значения счётчиков и скорость отправки в письмах в секунду."""
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                'batches': self.batches,
+                'sent': self.sent,
+                'failed': self.failed,
+                'elapsed': elapsed,
+                'rate': self.sent / max(elapsed, 1e-6),
+            }
+
+
+def send_batch(emails):
+    """Отправка пачки писем через одно соединение с почтовым сервером.
+
+    Ошибка отдельного письма не прерывает отправку остальных; если не
+    удалось открыть соединение, ошибкой отмечаются все письма пачки.
+    Обращений к БД нет, поэтому пачки можно отправлять в разных потоках.
+    Возвращает отправленные письма и пары (письмо, ошибка).
+    """
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except DELIVERY_ERRORS as error:
+        return sent, [(email, error) for email in emails]
+    try:
+        for email in emails:
+            try:
+                email.to_message(connection).send()
+            except DELIVERY_ERRORS as error:
+                failed.append((email, error))
+            else:
+                sent.append(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record_results(sent, failed, metrics=None):
+    """Сохранение результатов отправки пачки в очереди."""
+    mark_sent(sent)
+    for email, error in failed:
+        mark_failed(email, error)
+    if metrics is not None:
+        metrics.add_batch(len(sent), len(failed))
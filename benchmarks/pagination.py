@@ -0,0 +1,88 @@
+"""Сравнение постраничной пагинации и пагинации по курсору.
+
+Замеряет время GET-запроса к /api/v1/titles/{title_id}/reviews/ для
+первой и глубокой страницы в обоих режимах. Постраничные запросы
+замеряются без кэширования количества объектов, чтобы каждый из них
+выполнял COUNT(*), и отдельно — с количеством из кэша:
+
+    python benchmarks/pagination.py --page 10000
+"""
+import argparse
+
+from utils import measure, report, setup_database, teardown_database
+
+from django.contrib.auth import get_user_model  # noqa: I100
+from django.test import override_settings
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from api.pagination import KeysetPagination
+from reviews.models import Category, Review, Title
+
+User = get_user_model()
+
+
+def populate(reviews_count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(name='Блокбастер', year=2020,
+                                 category=category)
+    users = User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(reviews_count)
+    )
+    Review.objects.bulk_create(
+        (Review(title=title, author=user, text='text', score=idx % 10 + 1)
+         for idx, user in enumerate(users)),
+        batch_size=5000,
+    )
+    return title
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = setup_database()
+    try:
+        page_size = api_settings.PAGE_SIZE
+        title = populate(args.page * page_size)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        client = APIClient()
+        ordering = ('-pub_date', 'id')
+        last_before_page = Review.objects.filter(title=title).order_by(
+            *ordering)[(args.page - 1) * page_size - 1]
+        paginator = KeysetPagination()
+        paginator.ordering = ordering
+        cursor = paginator.encode_cursor(
+            paginator.get_position(last_before_page))
+
+        def get(query):
+            response = client.get(url + query)
+            assert response.status_code == 200, response.content
+            return response
+
+        # Разогревающий вызов measure() сохранил бы количество в кэш,
+        # и замеряемые запросы не выполняли бы COUNT(*).
+        with override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=0):
+            rows = [
+                ('page=1', measure(lambda: get('?page=1'), args.repeat)),
+                (f'page={args.page}',
+                 measure(lambda: get(f'?page={args.page}'), args.repeat)),
+            ]
+        rows += [
+            (f'page={args.page}, количество из кэша',
+             measure(lambda: get(f'?page={args.page}'), args.repeat)),
+            ('cursor, страница 1',
+             measure(lambda: get('?pagination=cursor'), args.repeat)),
+            (f'cursor, страница {args.page}',
+             measure(lambda: get(f'?cursor={cursor}'), args.repeat)),
+        ]
+        report(f'Отзывов: {args.page * page_size}', rows)
+    finally:
+        teardown_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
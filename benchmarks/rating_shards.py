@@ -0,0 +1,119 @@
+"""Одновременные отзывы к одному произведению с частями счётчиков
+рейтинга и без них.
+
+Каждый поток создаёт заданное количество отзывов от своих пользователей
+POST-запросами к /api/v1/titles/{title_id}/reviews/. Замер выполняется
+с RATING_SHARDS = 0 (рейтинг в строке произведения) и с заданным
+количеством частей, каждый раз на новой базе данных. Выигрыш заметен
+на СУБД с блокировкой строк (DB_PROFILE=postgresql); SQLite выполняет
+записи по одной на всю базу данных:
+
+    python benchmarks/rating_shards.py --threads 16 --reviews 50 --shards 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from utils import setup_database, teardown_database
+
+from django.contrib.auth import get_user_model  # noqa: I100
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Title
+from reviews.ratings import compact_ratings, find_rating_drift
+
+User = get_user_model()
+
+
+def populate(threads, reviews):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(name='Блокбастер', year=2020,
+                                 category=category)
+    users = User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(threads * reviews)
+    )
+    return title, [users[idx::threads] for idx in range(threads)]
+
+
+def worker(title, users, barrier, stats, lock):
+    """Создание отзывов от каждого пользователя потока."""
+    client = APIClient()
+    url = f'/api/v1/titles/{title.id}/reviews/'
+    counts = {'writes': 0, 'errors': 0}
+    try:
+        barrier.wait()
+        for idx, user in enumerate(users):
+            client.force_authenticate(user)
+            try:
+                response = client.post(
+                    url, {'text': 'text', 'score': idx % 10 + 1})
+            except Exception:
+                counts['errors'] += 1
+                continue
+            counts['writes' if response.status_code < 400 else 'errors'] += 1
+    finally:
+        connection.close()
+    with lock:
+        for key, value in counts.items():
+            stats[key] += value
+
+
+def run(shards, args):
+    """Запуск потоков на новой базе данных с заданным RATING_SHARDS."""
+    directory = tempfile.mkdtemp()
+    with override_settings(RATING_SHARDS=shards):
+        old_name = setup_database(os.path.join(directory, 'bench.sqlite3'))
+        try:
+            title, users = populate(args.threads, args.reviews)
+            connection.close()
+            stats = {'writes': 0, 'errors': 0}
+            lock = threading.Lock()
+            barrier = threading.Barrier(args.threads + 1)
+            threads = [
+                threading.Thread(target=worker, args=(
+                    title, thread_users, barrier, stats, lock))
+                for thread_users in users
+            ]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            stats['elapsed'] = time.perf_counter() - started
+            started = time.perf_counter()
+            compact_ratings()
+            stats['compaction'] = (time.perf_counter() - started) * 1000
+            stats['drift'] = find_rating_drift().count()
+        finally:
+            teardown_database(old_name)
+            os.rmdir(directory)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--reviews', type=int, default=50,
+                        help='Количество отзывов от одного потока.')
+    parser.add_argument('--shards', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f'Потоков: {args.threads}, отзывов на поток: {args.reviews}, '
+          f'СУБД: {connection.vendor}')
+    for name, shards in (('без частей', 0),
+                         (f'{args.shards} частей', args.shards)):
+        stats = run(shards, args)
+        print(f'  {name:<12} {stats["writes"] / stats["elapsed"]:8.1f} '
+              f'отзывов/с (ошибок {stats["errors"]}, перенос частей '
+              f'{stats["compaction"]:.1f} ms, расхождений рейтинга '
+              f'{stats["drift"]})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Конкурентные чтения и записи отзывов при разных PRAGMA SQLite.
+
+Несколько потоков в течение заданного времени выполняют GET-запросы
+к /api/v1/titles/{title_id}/reviews/ и PATCH-запросы к своим отзывам.
+Замер выполняется с журналом отката (поведение SQLite по умолчанию)
+и с settings.SQLITE_PRAGMAS, каждый раз на новом файле базы данных:
+
+    python benchmarks/review_concurrency.py --threads 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from utils import setup_database, teardown_database
+
+from django.conf import settings  # noqa: I100
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Review, Title
+from reviews.ratings import rebuild_ratings
+
+User = get_user_model()
+
+# Журнал отката и полная синхронизация, как без настройки соединения.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def populate(threads, reviews_count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(name='Блокбастер', year=2020,
+                                 category=category)
+    users = User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(max(threads, reviews_count))
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=user, text='text', score=idx % 10 + 1)
+        for idx, user in enumerate(users)
+    )
+    rebuild_ratings()
+    reviews = Review.objects.filter(title=title).select_related('author')
+    return title, list(reviews.order_by('id')[:threads])
+
+
+def worker(title, review, write_ratio, deadline, stats, lock):
+    """Случайная последовательность чтений списка и изменений отзыва."""
+    client = APIClient()
+    client.force_authenticate(review.author)
+    url = f'/api/v1/titles/{title.id}/reviews/'
+    rng = random.Random(review.id)
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    try:
+        while time.monotonic() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    response = client.patch(
+                        f'{url}{review.id}/',
+                        {'score': rng.randint(1, 10)},
+                    )
+                    key = 'writes'
+                else:
+                    response = client.get(url)
+                    key = 'reads'
+            except Exception:
+                counts['errors'] += 1
+                continue
+            counts[key if response.status_code < 400 else 'errors'] += 1
+    finally:
+        connection.close()
+    with lock:
+        for key, value in counts.items():
+            stats[key] += value
+
+
+def run(pragmas, args):
+    """Запуск потоков на новой базе данных с заданными PRAGMA."""
+    directory = tempfile.mkdtemp()
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        old_name = setup_database(os.path.join(directory, 'bench.sqlite3'))
+        try:
+            title, reviews = populate(args.threads, args.reviews)
+            connection.close()
+            stats = {'reads': 0, 'writes': 0, 'errors': 0}
+            lock = threading.Lock()
+            deadline = time.monotonic() + args.seconds
+            threads = [
+                threading.Thread(target=worker, args=(
+                    title, review, args.write_ratio, deadline, stats, lock))
+                for review in reviews
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            teardown_database(old_name)
+            os.rmdir(directory)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--reviews', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f'Потоков: {args.threads}, доля записей: {args.write_ratio}, '
+          f'{args.seconds} с на замер')
+    for name, pragmas in (('журнал отката', DEFAULT_PRAGMAS),
+                          ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS)):
+        stats = run(pragmas, args)
+        total = stats['reads'] + stats['writes']
+        print(f'  {name:<16} {total / args.seconds:8.1f} запросов/с '
+              f'(чтений {stats["reads"]}, записей {stats["writes"]}, '
+              f'ошибок {stats["errors"]})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Сортировка списка произведений по рейтингу, году и названию.
+
+Создаёт count синтетических произведений с оценками и замеряет время
+GET-запроса к /api/v1/titles/ с каждым значением параметра ordering:
+первой страницы, глубокой страницы по курсору и глубокой страницы
+по номеру. Затем индексы сортировки удаляются, и замер повторяется:
+
+    python benchmarks/title_ordering.py --count 1000000
+"""
+import argparse
+import random
+
+from utils import measure, report, setup_database, teardown_database
+
+from django.db import connection  # noqa: I100
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from api.filters import TitleOrderingFilter
+from api.pagination import KeysetPagination
+from reviews.models import Category, Title
+
+# Индексы, добавленные для сортировки; title_year_id_idx нужен и для
+# сортировки по умолчанию, поэтому не удаляется.
+ORDERING_INDEXES = (
+    'title_rating_avg_id_idx', 'title_rated_rating_avg_id_idx',
+    'title_rating_weighted_id_idx', 'title_name_id_idx',
+)
+WORDS = ('война', 'мир', 'мастер', 'маргарита', 'отцы', 'дети', 'идиот',
+         'star', 'wars', 'matrix', 'godfather', 'redemption')
+
+
+def populate(count, batch_size=10000):
+    category = Category.objects.create(name='Фильм', slug='films')
+    generator = random.Random(0)
+    for start in range(0, count, batch_size):
+        titles = []
+        for _ in range(min(batch_size, count - start)):
+            rating_count = generator.choice((0, 1, 3, 10, 50, 500))
+            titles.append(Title(
+                name=' '.join(generator.choices(WORDS, k=3)),
+                year=generator.randint(1900, 2024),
+                category=category,
+                rating_count=rating_count,
+                rating_sum=sum(generator.choices(range(1, 11),
+                                                 k=rating_count)),
+            ))
+        Title.objects.bulk_create(titles)
+
+
+def get_cursor(ordering, page):
+    """Курсор страницы page при сортировке ordering."""
+    page_size = api_settings.PAGE_SIZE
+    paginator = KeysetPagination()
+    paginator.ordering = ordering
+    last = Title.objects.order_by(*ordering)[(page - 1) * page_size - 1]
+    return paginator.encode_cursor(paginator.get_position(last))
+
+
+def measure_orderings(client, args):
+    rows = []
+    for value, ordering in TitleOrderingFilter.orderings.items():
+        cursor = get_cursor(ordering, args.page)
+
+        def get(query):
+            response = client.get(f'/api/v1/titles/?ordering={value}{query}')
+            assert response.status_code == 200, response.content
+            return response
+
+        rows += [
+            (f'{value}, страница 1',
+             measure(lambda: get(''), args.repeat)),
+            (f'{value}, cursor, страница {args.page}',
+             measure(lambda: get(f'&cursor={cursor}'), args.repeat)),
+            (f'{value}, page={args.page}',
+             measure(lambda: get(f'&page={args.page}'), args.repeat)),
+        ]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--page', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    old_name = setup_database()
+    try:
+        populate(args.count)
+        client = APIClient()
+        report(f'Произведений: {args.count}, с индексами',
+               measure_orderings(client, args))
+        with connection.schema_editor() as schema_editor:
+            for index in Title._meta.indexes:
+                if index.name in ORDERING_INDEXES:
+                    schema_editor.remove_index(Title, index)
+        report(f'Произведений: {args.count}, без индексов сортировки',
+               measure_orderings(client, args))
+    finally:
+        teardown_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
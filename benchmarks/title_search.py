@@ -0,0 +1,75 @@
+"""Сравнение полнотекстового поиска произведений с поиском по подстроке.
+
+Создаёт count синтетических произведений и замеряет время
+GET-запроса к /api/v1/titles/ с параметром search (полнотекстовый
+индекс) и с фильтром name (icontains, LIKE '%...%'):
+
+    python benchmarks/title_search.py --count 1000000
+"""
+import argparse
+import random
+
+from utils import measure, report, setup_database, teardown_database
+
+from rest_framework.test import APIClient  # noqa: I100
+
+from reviews.models import Category, Title
+
+WORDS = (
+    'гордость', 'предубеждение', 'война', 'мир', 'преступление',
+    'наказание', 'мастер', 'маргарита', 'отцы', 'дети', 'идиот', 'бесы',
+    'пиковая', 'дама', 'мёртвые', 'души', 'горе', 'ума', 'тихий', 'дон',
+    'star', 'wars', 'matrix', 'godfather', 'shawshank', 'redemption',
+)
+
+
+def populate(count, batch_size=10000):
+    category = Category.objects.create(name='Фильм', slug='films')
+    generator = random.Random(0)
+    for start in range(0, count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(generator.choices(WORDS, k=3)),
+                description=' '.join(generator.choices(WORDS, k=12)),
+                year=generator.randint(1900, 2024),
+                category=category,
+            )
+            for _ in range(min(batch_size, count - start))
+        )
+    # Редкое слово, встречающееся в названии одного произведения.
+    Title.objects.filter(pk=count // 2).update(name='Зеркало')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    old_name = setup_database()
+    try:
+        populate(args.count)
+        client = APIClient()
+        url = '/api/v1/titles/'
+
+        def get(params):
+            response = client.get(url, params)
+            assert response.status_code == 200, response.content
+            return response
+
+        report(f'Произведений: {args.count}', [
+            ('search, редкое слово',
+             measure(lambda: get({'search': 'зеркало'}), args.repeat)),
+            ('name icontains, редкое слово',
+             measure(lambda: get({'name': 'зеркало'}), args.repeat)),
+            ('search, частое слово',
+             measure(lambda: get({'search': 'маргарита'}), args.repeat)),
+            ('name icontains, частое слово',
+             measure(lambda: get({'name': 'маргарита'}), args.repeat)),
+        ])
+    finally:
+        teardown_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
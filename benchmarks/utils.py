@@ -0,0 +1,59 @@
+"""Общие инструменты для замеров производительности API.
+
+Замеры выполняются на временной тестовой базе данных, которая создаётся
+при вызове setup_database() и удаляется в teardown_database().
+"""
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment, teardown_test_environment
+)
+
+
+def setup_database(name=None):
+    """Создание временной базы данных с применёнными миграциями.
+
+    name задаёт файл базы данных SQLite вместо базы в памяти; он нужен
+    для замеров с несколькими соединениями.
+    """
+    setup_test_environment()
+    if name:
+        connection.settings_dict['TEST']['NAME'] = name
+    return connection.creation.create_test_db(verbosity=0)
+
+
+def teardown_database(old_name):
+    """Удаление временной базы данных."""
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+
+def measure(func, repeat=20):
+    """Медиана времени выполнения func в миллисекундах."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(title, rows):
+    """Вывод результатов замеров в виде таблицы."""
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f'  {name:<{width}}  {value:10.2f} ms')
@@ -0,0 +1,253 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from tests.utils import (
+    create_comments, create_reviews, create_single_comment,
+    create_genre, create_single_review, create_titles_in_db
+)
+
+User = get_user_model()
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return len(context.captured_queries)
+
+
+def count_write_queries(client, method, url, data, expected_status):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(
+            url, data=data, format='json')
+    assert response.status_code == expected_status, (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` с корректными '
+        f'данными возвращает ответ со статусом {expected_status}.'
+    )
+    return len(context.captured_queries), response.json()
+
+
+def count_delete_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.delete(url)
+    assert response.status_code == HTTPStatus.NO_CONTENT, (
+        f'Проверьте, что DELETE-запрос к `{url}` возвращает ответ со '
+        'статусом 204.'
+    )
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_titles_list_query_count(self, client):
+        create_titles_in_db(1)
+        single = count_queries(client, self.TITLES_URL)
+        create_titles_in_db(4)
+        full_page = count_queries(client, self.TITLES_URL)
+        assert single == full_page, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от количества произведений на '
+            f'странице: {single} запрос(ов) для одного произведения и '
+            f'{full_page} для полной страницы.'
+        )
+
+    def test_02_title_detail_query_count(self, client):
+        title = create_titles_in_db(1)[0]
+        queries = count_queries(
+            client, self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert queries <= 2, (
+            'Проверьте, что GET-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` загружает жанры и '
+            'категорию произведения не более чем двумя запросами к БД.'
+        )
+
+    def test_03_review_detail_query_count(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        queries = count_queries(client, url)
+        assert queries == 1, (
+            f'Проверьте, что GET-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE}` '
+            'загружает отзыв вместе с автором одним запросом к БД.'
+        )
+        response = client.get(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что GET-запрос к отзыву другого произведения '
+            'возвращает ответ со статусом 404.'
+        )
+
+    def test_04_reviews_list_query_count(self, client, admin_client, admin,
+                                         user_client, user, moderator_client,
+                                         moderator):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        single = count_queries(client, url)
+        for author_client in (user_client, moderator_client):
+            create_single_review(author_client, titles[0]['id'], 'text', 5)
+        several = count_queries(client, url)
+        assert single == several, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` не зависит от количества '
+            f'отзывов на странице: {single} запрос(ов) для одного отзыва и '
+            f'{several} для трёх.'
+        )
+
+    def test_05_comments_list_query_count(self, client, admin_client, admin,
+                                          user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        single = count_queries(client, url)
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'text'
+        )
+        several = count_queries(client, url)
+        assert single == several, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` не зависит от количества '
+            'комментариев на странице.'
+        )
+
+    def test_06_title_write_query_count(self, admin_client):
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        data = {'name': 'Терминатор', 'year': 1984, 'category': 'films'}
+        single, _ = count_write_queries(
+            admin_client, 'post', self.TITLES_URL,
+            {**data, 'genre': genres[:1]}, HTTPStatus.CREATED
+        )
+        several, response_data = count_write_queries(
+            admin_client, 'post', self.TITLES_URL,
+            {**data, 'genre': genres}, HTTPStatus.CREATED
+        )
+        assert single == several, (
+            f'Проверьте, что количество запросов к БД при POST-запросе к '
+            f'`{self.TITLES_URL}` не зависит от количества жанров: '
+            f'{single} запрос(ов) для одного жанра и {several} для трёх.'
+        )
+        assert sorted(
+            genre['slug'] for genre in response_data['genre']
+        ) == sorted(genres), (
+            f'Проверьте, что ответ на POST-запрос к `{self.TITLES_URL}` '
+            'содержит все переданные жанры.'
+        )
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=response_data['id'])
+        patch_single, _ = count_write_queries(
+            admin_client, 'patch', url, {'genre': genres[:1]},
+            HTTPStatus.OK
+        )
+        patch_several, response_data = count_write_queries(
+            admin_client, 'patch', url, {'genre': genres}, HTTPStatus.OK
+        )
+        assert patch_single == patch_several, (
+            'Проверьте, что количество запросов к БД при PATCH-запросе к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` не зависит от количества '
+            'жанров.'
+        )
+        assert admin_client.get(url).json()['genre'] == (
+            response_data['genre']), (
+            'Проверьте, что жанры в ответе на PATCH-запрос совпадают '
+            'с жанрами, сохранёнными в БД.'
+        )
+
+    def test_07_title_write_unknown_genres(self, admin_client):
+        create_genre(admin_client)
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Терминатор',
+            'year': 1984,
+            'category': 'films',
+            'genre': ['horror', 'unknown-1', 'unknown-2'],
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.TITLES_URL}` с '
+            'несуществующими жанрами возвращает ответ со статусом 400.'
+        )
+        errors = ' '.join(response.json().get('genre', []))
+        assert 'unknown-1' in errors and 'unknown-2' in errors, (
+            'Проверьте, что в ответе перечислены все несуществующие '
+            'жанры.'
+        )
+
+    def create_commented_reviews(self, comments_count, moderator):
+        """Произведение с отзывом модератора и комментариями нового
+        пользователя."""
+        title = create_titles_in_db(1)[0]
+        review = Review.objects.create(
+            title=title, author=moderator, text='text', score=5)
+        username = f'commenter{User.objects.count()}'
+        author = User.objects.create_user(
+            username=username, email=f'{username}@yamdb.fake')
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='text')
+            for _ in range(comments_count)
+        )
+        return title, review, author
+
+    def test_08_cascade_delete_query_count(self, admin_client, moderator):
+        # Администратор загружается в кэш аутентификации до замеров.
+        admin_client.get('/api/v1/users/me/')
+        counts = {}
+        for comments_count in (5, 100):
+            title, _, _ = self.create_commented_reviews(
+                comments_count, moderator)
+            counts[comments_count], _ = count_delete_queries(
+                admin_client,
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id),
+            )
+        assert counts[5] == counts[100], (
+            'Проверьте, что количество запросов к БД при DELETE-запросе '
+            f'к `{self.TITLE_DETAIL_URL_TEMPLATE}` не зависит от количества '
+            f'комментариев: {counts[5]} запрос(ов) для 5 комментариев '
+            f'и {counts[100]} для 100.'
+        )
+
+        counts = {}
+        for comments_count in (5, 100):
+            _, review, author = self.create_commented_reviews(
+                comments_count, moderator)
+            modified = review.modified
+            counts[comments_count], _ = count_delete_queries(
+                admin_client, f'/api/v1/users/{author.username}/')
+            review.refresh_from_db()
+            assert review.modified > modified, (
+                'Проверьте, что удаление автора комментариев обновляет дату '
+                'изменения отзывов, к которым они оставлены.'
+            )
+        assert counts[5] == counts[100], (
+            'Проверьте, что количество запросов к БД при DELETE-запросе '
+            'к `/api/v1/users/{username}/` не зависит от количества '
+            f'комментариев пользователя: {counts[5]} запрос(ов) для 5 '
+            f'комментариев и {counts[100]} для 100.'
+        )
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import KeysetPagination
+from tests.utils import create_single_review, create_titles_in_db
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_cursor_pagination(self, client):
+        titles = create_titles_in_db(7)
+        expected_ids = [
+            title.id for title in sorted(titles, key=lambda t: t.id)
+        ]
+
+        response = client.get(f'{self.TITLES_URL}?pagination=cursor')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме пагинации по курсору ответ не '
+            'содержит ключ `count`.'
+        )
+        assert data['previous'] is None
+        first_page = [title['id'] for title in data['results']]
+        assert first_page == expected_ids[:5], (
+            'Проверьте, что пагинация по курсору сохраняет порядок '
+            'сортировки произведений.'
+        )
+
+        response = client.get(data['next'])
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == (
+            expected_ids[5:]
+        ), (
+            'Проверьте, что ссылка `next` в режиме пагинации по курсору '
+            'ведёт на следующую страницу.'
+        )
+        assert data['next'] is None
+
+        response = client.get(data['previous'])
+        data = response.json()
+        assert [title['id'] for title in data['results']] == first_page, (
+            'Проверьте, что ссылка `previous` в режиме пагинации по курсору '
+            'ведёт на предыдущую страницу.'
+        )
+
+    def test_02_page_number_pagination_is_default(self, client):
+        create_titles_in_db(7)
+        data = client.get(f'{self.TITLES_URL}?page=2').json()
+        assert data['count'] == 7
+        assert len(data['results']) == 2
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        title = create_titles_in_db(1)[0]
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        for url, position in (
+            (self.TITLES_URL, ['abc', 1]),
+            (self.TITLES_URL, [2000, {'id': 1}]),
+            (f'{self.TITLES_URL}?ordering=name', [None, 'abc']),
+            (reviews_url, ['notadate', 1]),
+            (reviews_url, [[2000], 1]),
+        ):
+            cursor = KeysetPagination.encode_cursor(position)
+            separator = '&' if '?' in url else '?'
+            response = client.get(f'{url}{separator}cursor={cursor}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` с курсором, '
+                f'значения которого {position} не соответствуют полям '
+                'сортировки, возвращает ответ со статусом 404.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CachedCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def get_with_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        count_queries = [
+            query for query in context.captured_queries
+            if 'COUNT(' in query['sql'].upper()
+        ]
+        return response.json(), count_queries
+
+    def test_01_count_is_cached(self, client, user_client, admin_client):
+        title = create_titles_in_db(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+
+        data, count_queries = self.get_with_queries(client, url)
+        assert data['count'] == 0 and count_queries
+        data, count_queries = self.get_with_queries(client, url)
+        assert data['count'] == 0
+        assert not count_queries, (
+            f'Проверьте, что при повторном GET-запросе к `{url}` общее '
+            'количество объектов берётся из кэша.'
+        )
+
+        create_single_review(user_client, title.id, 'text', 5)
+        data, _ = self.get_with_queries(client, url)
+        assert data['count'] == 1, (
+            f'Проверьте, что после создания отзыва через `{url}` '
+            'закэшированное количество объектов сбрасывается.'
+        )
+
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data, _ = self.get_with_queries(client, '/api/v1/titles/')
+        assert data['count'] == 0
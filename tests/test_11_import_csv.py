@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.management.commands.import_csv import Command
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCSV:
+
+    def test_01_dry_run_does_not_save(self):
+        call_command('import_csv', '--dry-run')
+        assert not Title.objects.exists(), (
+            'Проверьте, что команда `import_csv --dry-run` не сохраняет '
+            'данные в БД.'
+        )
+
+    def test_02_import(self):
+        call_command('import_csv', '--batch-size', '10')
+        assert Title.objects.exists()
+        assert Review.objects.exists()
+        assert Comment.objects.exists()
+        assert Title.genre.through.objects.exists(), (
+            'Проверьте, что команда `import_csv` загружает жанры '
+            'произведений.'
+        )
+        call_command('recalculate_ratings', '--check')
+
+        reviews_count = Review.objects.count()
+        for options in ((), ('--dry-run',)):
+            out = io.StringIO()
+            call_command('import_csv', *options, stdout=out)
+            assert Review.objects.count() == reviews_count, (
+                'Проверьте, что повторный запуск `import_csv` не дублирует '
+                'данные.'
+            )
+            line = next(line for line in out.getvalue().splitlines()
+                        if line.startswith('review.csv:'))
+            assert (line.startswith('review.csv: 0 строк')
+                    and line.endswith(f'пропущено {reviews_count}')), (
+                'Проверьте, что `import_csv` считает только вставленные '
+                'строки, а строки, уже загруженные или нарушающие '
+                'ограничения, выводит как пропущенные.'
+            )
+
+    def test_03_resume_from_checkpoint(self, tmp_path, monkeypatch):
+        checkpoint = tmp_path / 'checkpoint.json'
+        build_review = Command.build_review
+
+        def failing_build_review(command, row):
+            if row['id'] == '40':
+                raise RuntimeError('Прерывание загрузки')
+            return build_review(command, row)
+
+        monkeypatch.setattr(Command, 'build_review', failing_build_review)
+        with pytest.raises(RuntimeError):
+            call_command('import_csv', '--chunk-size', '10',
+                         '--checkpoint', str(checkpoint))
+        state = json.loads(checkpoint.read_text())['review.csv']
+        assert not state['complete']
+        loaded_reviews = Review.objects.count()
+        assert 0 < loaded_reviews < 72
+
+        monkeypatch.setattr(Command, 'build_review', build_review)
+        read_rows = []
+        import_chunk = Command.import_chunk
+
+        def counting_import_chunk(command, filepath, *args):
+            if filepath.endswith('review.csv'):
+                read_rows.extend(args[-2][2])
+            return import_chunk(command, filepath, *args)
+
+        monkeypatch.setattr(Command, 'import_chunk', counting_import_chunk)
+        call_command('import_csv', '--chunk-size', '10',
+                     '--checkpoint', str(checkpoint))
+        assert Review.objects.count() == 72
+        assert len(read_rows) == 72 - loaded_reviews, (
+            'Проверьте, что при продолжении загрузки по контрольной точке '
+            'уже загруженные строки не читаются повторно.'
+        )
+        call_command('recalculate_ratings', '--check')
+
+    def test_04_parallel_import(self, tmp_path, monkeypatch):
+        data_dir = os.path.join(settings.BASE_DIR, 'static', 'data')
+        expected = {}
+        for filename, model, *_ in Command.files:
+            with open(os.path.join(data_dir, filename),
+                      encoding='utf-8') as csv_file:
+                expected[model] = sum(1 for _ in csv.DictReader(csv_file))
+
+        checkpoint = tmp_path / 'checkpoint.json'
+        build_review = Command.build_review
+
+        def failing_build_review(command, row):
+            if row['id'] == '40':
+                raise RuntimeError('Прерывание загрузки')
+            return build_review(command, row)
+
+        monkeypatch.setattr(Command, 'build_review', failing_build_review)
+        options = ('--workers', '4', '--chunk-size', '10',
+                   '--checkpoint', str(checkpoint))
+        with pytest.raises(RuntimeError):
+            call_command('import_csv', *options)
+        assert not json.loads(
+            checkpoint.read_text())['review.csv']['complete']
+        assert Review.objects.count() < expected[Review]
+
+        monkeypatch.setattr(Command, 'build_review', build_review)
+        call_command('import_csv', *options)
+        for model, count in expected.items():
+            assert model.objects.count() == count, (
+                'Проверьте, что параллельная загрузка `import_csv '
+                '--workers` с продолжением по контрольной точке загружает '
+                f'все строки {model._meta.label}.'
+            )
+        call_command('recalculate_ratings', '--check')
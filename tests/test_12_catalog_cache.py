@@ -0,0 +1,80 @@
+import warnings
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import CacheKeyWarning
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CatalogCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def get_with_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), len(context.captured_queries)
+
+    def test_01_categories_list_is_cached(self, client, admin_client):
+        create_categories(admin_client)
+        data, _ = self.get_with_queries(client, self.CATEGORY_URL)
+        cached_data, queries = self.get_with_queries(client, self.CATEGORY_URL)
+        assert cached_data == data
+        assert queries == 0, (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'обслуживается из кэша без запросов к БД.'
+        )
+
+        search_data, _ = self.get_with_queries(
+            client, f'{self.CATEGORY_URL}?search=Книги'
+        )
+        assert search_data['count'] == 1, (
+            'Проверьте, что результаты поиска кэшируются отдельно от '
+            'полного списка.'
+        )
+
+        response = admin_client.delete(f'{self.CATEGORY_URL}books/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data, _ = self.get_with_queries(client, self.CATEGORY_URL)
+        assert data['count'] == 1, (
+            f'Проверьте, что удаление категории через `{self.CATEGORY_URL}` '
+            'сбрасывает кэш списка.'
+        )
+
+    def test_02_model_changes_invalidate_cache(self, client, admin_client):
+        create_genre(admin_client)
+        self.get_with_queries(client, self.GENRES_URL)
+        Genre.objects.filter(slug='drama').get().delete()
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        data, _ = self.get_with_queries(client, self.GENRES_URL)
+        assert data['count'] == 2
+        assert {'name': 'Хоррор', 'slug': 'horror'} in data['results'], (
+            'Проверьте, что изменение жанра вне API (например, в '
+            'админ-зоне) сбрасывает кэш списка жанров.'
+        )
+
+    def test_03_cache_key_is_valid_for_memcached(self, client, admin_client):
+        create_categories(admin_client)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', CacheKeyWarning)
+            data, _ = self.get_with_queries(
+                client, f'{self.CATEGORY_URL}?search=Кни ги%0A' + 'к' * 300
+            )
+        assert data['count'] == 0
+        assert not [
+            warning for warning in caught
+            if issubclass(warning.category, CacheKeyWarning)
+        ], (
+            'Проверьте, что ключ кэша списка не содержит строку поиска '
+            'как есть: пробелы, управляющие символы и длинные строки '
+            'недопустимы в ключах Memcached.'
+        )
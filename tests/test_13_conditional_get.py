@@ -0,0 +1,145 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre, Title
+from tests.utils import (
+    create_comments, create_reviews, create_single_review
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.headers.get('ETag')
+        assert etag and response.headers.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        return etag
+
+    def test_01_title_and_reviews(self, client, admin_client, admin,
+                                  user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        title_etag = self.check_not_modified(client, title_url)
+        reviews_etag = self.check_not_modified(client, reviews_url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 1)
+        for url, etag in ((title_url, title_etag),
+                          (reviews_url, reviews_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после добавления отзыва GET-запрос к '
+                f'`{url}` с прежним `If-None-Match` возвращает новые данные.'
+            )
+        self.check_not_modified(client, '/api/v1/titles/')
+
+    def test_02_comments(self, client, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        comment_url = self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'],
+            comment_id=comments[0]['id']
+        )
+        etag = self.check_not_modified(client, comments_url)
+        self.check_not_modified(client, comment_url)
+
+        response = admin_client.patch(comment_url, data={'text': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения комментария GET-запрос к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` с прежним `If-None-Match` '
+            'возвращает новые данные.'
+        )
+
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_titles_list_after_delete(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        etag = self.check_not_modified(client, '/api/v1/titles/')
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления произведения GET-запрос к '
+            '`/api/v1/titles/` с прежним `If-None-Match` возвращает '
+            'новые данные.'
+        )
+
+    def check_modified_since(self, client, url, change):
+        """Ответ с прежним If-Modified-Since после изменения change."""
+        last_modified = client.get(url).headers['Last-Modified']
+        # Last-Modified передаётся с точностью до секунды.
+        time.sleep(1)
+        change()
+        return client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    def test_04_last_modified_after_title_delete(self, client, admin_client,
+                                                 admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        response = self.check_modified_since(
+            client, '/api/v1/titles/',
+            lambda: admin_client.delete(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'])),
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления произведения GET-запрос к '
+            '`/api/v1/titles/` с прежним `If-Modified-Since` возвращает '
+            'новые данные.'
+        )
+
+    def test_05_last_modified_after_genre_rename(self, client, admin_client,
+                                                 admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+
+        def rename_genre():
+            genre = Genre.objects.get(slug=titles[0]['genre'][0])
+            genre.name = 'Новое название'
+            genre.save()
+
+        response = self.check_modified_since(client, title_url, rename_genre)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после переименования жанра GET-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` с прежним '
+            '`If-Modified-Since` возвращает новые данные.'
+        )
+        assert 'Новое название' in [
+            genre['name'] for genre in response.json()['genre']
+        ]
@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'терми') == ['Терминатор'], (
+            'Проверьте, что поиск произведений находит слова по началу, '
+            'без учёта регистра.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск произведений учитывает описание.'
+        )
+        assert self.search(client, 'терминатор орешек') == []
+
+    def test_02_search_ranking_and_sync(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[1]['id']).update(
+            description='Не Терминатор'
+        )
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что совпадения в названии произведения выводятся '
+            'выше совпадений в описании.'
+        )
+        response = admin_client.delete(
+            f'{self.TITLES_URL}{titles[0]["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.search(client, 'терминатор') == ['Крепкий орешек'], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
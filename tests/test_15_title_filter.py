@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def filter_titles(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_exact_slug_filters(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.filter_titles(client, genre='horror') == ['Терминатор']
+        assert self.filter_titles(client, genre='horr') == [], (
+            'Проверьте, что фильтр `genre` сравнивает слаг жанра целиком.'
+        )
+        assert self.filter_titles(client, genre='horror,comedy') == [
+            'Терминатор'
+        ], (
+            'Проверьте, что фильтр по нескольким жанрам не дублирует '
+            'произведения.'
+        )
+        assert self.filter_titles(client, genre='comedy,drama') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.filter_titles(client, category='books') == [
+            'Крепкий орешек'
+        ]
+        assert self.filter_titles(client, category='book') == []
+        assert self.filter_titles(client, category='unknown,films') == [
+            'Терминатор'
+        ]
+
+    def test_02_fuzzy_and_range_filters(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.filter_titles(client, genre__icontains='OR') == [
+            'Терминатор'
+        ], (
+            'Проверьте, что поиск по части слага жанра доступен через '
+            'параметр `genre__icontains`.'
+        )
+        assert self.filter_titles(client, category__icontains='ook') == [
+            'Крепкий орешек'
+        ]
+        assert self.filter_titles(client, year__range='1980,1985') == [
+            'Терминатор'
+        ]
+        response = client.get(self.TITLES_URL, {'year__range': '1980'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что фильтр `year__range` требует две границы.'
+        )
+
+    def test_03_slug_lookup_is_cached(self, client, admin_client):
+        create_titles(admin_client)
+        self.filter_titles(client, genre='horror', category='films')
+        with CaptureQueriesContext(connection) as context:
+            self.filter_titles(client, genre='horror', category='films')
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_genre"."slug" IN' in query['sql']
+            or 'reviews_category"."slug" IN' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что ID жанров и категорий по слагам берутся '
+            'из кэша при повторных запросах.'
+        )
+
+        titles = client.get(self.TITLES_URL).json()['results']
+        title = next(
+            title for title in titles if title['name'] == 'Крепкий орешек'
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        admin_client.post(
+            '/api/v1/genres/', {'name': 'Новые ужасы', 'slug': 'horror'}
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{title["id"]}/', {'genre': ['horror']}
+        )
+        assert self.filter_titles(client, genre='horror') == [
+            'Крепкий орешек'
+        ], (
+            'Проверьте, что кэш ID по слагам сбрасывается при изменении '
+            'жанров.'
+        )
@@ -0,0 +1,22 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ExplainEndpoints:
+
+    def test_01_endpoints_use_indexes(self, admin_client, admin):
+        create_comments(admin_client, {admin: admin_client})
+        out = StringIO()
+        call_command('explain_endpoints', '--check', stdout=out)
+        output = out.getvalue()
+        for path in ('/api/v1/titles/', '/api/v1/users/',
+                     '/api/v1/categories/', '/comments/ (retrieve)'):
+            assert path in output, (
+                'Проверьте, что команда `explain_endpoints` выводит план '
+                f'запроса для `{path}`.'
+            )
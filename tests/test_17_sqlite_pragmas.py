@@ -0,0 +1,26 @@
+import pytest
+from django.db import connection, connections
+from django.test import override_settings
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17SQLitePragmas:
+
+    def test_01_pragmas_applied_on_connect(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Настройки PRAGMA применяются только к SQLite.')
+        pragmas = {'cache_size': -1234, 'temp_store': 'MEMORY'}
+        new_connection = connections.create_connection('default')
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                with new_connection.cursor() as cursor:
+                    cache_size = cursor.execute(
+                        'PRAGMA cache_size').fetchone()[0]
+                    temp_store = cursor.execute(
+                        'PRAGMA temp_store').fetchone()[0]
+        finally:
+            new_connection.close()
+        assert (cache_size, temp_store) == (-1234, 2), (
+            'Проверьте, что при открытии соединения с SQLite применяются '
+            'PRAGMA из настройки `SQLITE_PRAGMAS`.'
+        )
@@ -0,0 +1,126 @@
+import smtplib
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+from users.outbox import (
+    DispatchMetrics, claim_batch, queue_mail, record_results, send_batch
+)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, не отправляющий ни одного письма."""
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('Соединение разорвано.')
+
+
+class CountingEmailBackend(EmailBackend):
+    """Почтовый бэкенд в памяти, считающий открытые соединения."""
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    SIGNUP_DATA = {'email': 'outbox@yamdb.fake', 'username': 'outbox_user'}
+
+    @pytest.fixture(autouse=True)
+    def enable_outbox(self, settings):
+        settings.EMAIL_OUTBOX_ENABLED = True
+
+    def test_01_signup_queues_email(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что при включённой очереди писем регистрация не '
+            'отправляет письмо во время запроса.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == self.SIGNUP_DATA['email']
+        assert email.status == OutboxEmail.Status.PENDING
+
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_outbox` отправляет письма из '
+            'очереди.'
+        )
+        assert mail.outbox[0].to == [self.SIGNUP_DATA['email']]
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.Status.SENT
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_18_email_outbox.FailingEmailBackend')
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        call_command('send_outbox', '--once')
+        email = OutboxEmail.objects.get()
+        assert email.status == OutboxEmail.Status.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка письма откладывается.'
+        )
+        assert 'SMTPServerDisconnected' in email.last_error
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', '--once')
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.Status.FAILED, (
+            'Проверьте, что после `EMAIL_OUTBOX_MAX_ATTEMPTS` попыток '
+            'письмо отмечается как неотправленное.'
+        )
+
+    def queue_emails(self, count):
+        for idx in range(count):
+            queue_mail('Confirmation code', f'Код {idx}',
+                       [f'user{idx}@yamdb.fake'])
+
+    def test_03_one_connection_per_batch(self, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_18_email_outbox.CountingEmailBackend')
+        CountingEmailBackend.opened = 0
+        self.queue_emails(7)
+        metrics = DispatchMetrics()
+        while emails := claim_batch(3):
+            record_results(*send_batch(emails), metrics)
+        assert len(mail.outbox) == 7
+        assert CountingEmailBackend.opened == 3, (
+            'Проверьте, что письма из очереди отправляются через одно '
+            'соединение на пачку.'
+        )
+        snapshot = metrics.snapshot()
+        assert (snapshot['batches'], snapshot['sent'], snapshot['failed']) == (
+            3, 7, 0
+        )
+        assert not OutboxEmail.objects.exclude(
+            status=OutboxEmail.Status.SENT
+        ).exists()
+
+    def test_04_file_backend_batches(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend')
+        settings.EMAIL_FILE_PATH = tmp_path
+        self.queue_emails(5)
+        call_command('send_outbox', '--once', '--batch-size', '5')
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение '
+            'с файловым почтовым бэкендом.'
+        )
+        assert files[0].read_text().count('Subject: Confirmation code') == 5
@@ -0,0 +1,85 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api.serializers import SignUpSerializer
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SignUpConflicts:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_single_lookup_query(self, client):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'users_user' in query['sql']
+        ]
+        assert len(lookups) == 1, (
+            'Проверьте, что при регистрации пользователи с тем же '
+            '`username` или `email` ищутся одним запросом к БД.'
+        )
+
+    def test_02_race_between_validation_and_insert(self):
+        first = SignUpSerializer(
+            data={'username': 'racer', 'email': 'first@yamdb.fake'})
+        second = SignUpSerializer(
+            data={'username': 'racer', 'email': 'second@yamdb.fake'})
+        same = SignUpSerializer(
+            data={'username': 'racer', 'email': 'first@yamdb.fake'})
+        for serializer in (first, second, same):
+            assert serializer.is_valid()
+        user = first.save()
+        with pytest.raises(ValidationError) as error:
+            second.save()
+        assert 'username' in error.value.detail, (
+            'Проверьте, что одновременная регистрация пользователя с занятым '
+            '`username` возвращает ошибку валидации, а не ошибку сервера.'
+        )
+        assert same.save() == user, (
+            'Проверьте, что одновременная регистрация с теми же `username` '
+            'и `email` возвращает уже созданного пользователя.'
+        )
+
+    def test_03_concurrent_duplicate_signups(self, django_user_model):
+        statuses = []
+        barrier = threading.Barrier(8)
+
+        def signup(idx):
+            try:
+                client = APIClient()
+                barrier.wait()
+                response = client.post(self.URL_SIGNUP, data={
+                    'username': 'popular', 'email': f'user{idx}@yamdb.fake'
+                })
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=signup, args=(idx,)) for idx in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(statuses) == [HTTPStatus.OK] + (
+            [HTTPStatus.BAD_REQUEST] * 7
+        ), (
+            'Проверьте, что при одновременной регистрации с одинаковым '
+            '`username` создаётся один пользователь, а остальные запросы '
+            'получают ответ со статусом 400.'
+        )
+        assert django_user_model.objects.filter(
+            username='popular'
+        ).count() == 1
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles_in_db
+
+
+def get_client(user):
+    """Клиент с токеном, полученным через эндпоинт выдачи токена."""
+    client = APIClient()
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    token = response.json()['token']
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "users_user"' in (
+            query['sql']
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20StatelessJWT:
+
+    @pytest.fixture(autouse=True)
+    def enable_stateless_auth(self, settings):
+        settings.JWT_STATELESS_AUTH = True
+
+    def test_01_writes_without_user_query(self, user, admin):
+        title = create_titles_in_db(1)[0]
+        client = get_client(user)
+        # Первый запрос загружает из БД время отзыва токенов.
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Отзыв', 'score': 7},
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert not user_queries(context), (
+            'Проверьте, что при включённой `JWT_STATELESS_AUTH` '
+            'пользователь восстанавливается из токена без запроса к БД.'
+        )
+
+        admin_client = get_client(admin)
+        admin_client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/categories/', data={'name': 'Кино', 'slug': 'kino'}
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что роль пользователя берётся из токена доступа.'
+        )
+        assert not user_queries(context)
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_me_loads_user(self, user):
+        response = get_client(user).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == user.bio, (
+            'Проверьте, что `/api/v1/users/me/` загружает профиль '
+            'пользователя из БД.'
+        )
+
+    def test_03_token_revoked_on_role_change(self, user):
+        client = get_client(user)
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        user.role = 'admin'
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токены, выданные до изменения роли '
+            'пользователя, отклоняются.'
+        )
+
+    def test_04_token_issued_after_revocation(self, user):
+        user.role = 'moderator'
+        user.save()
+        response = get_client(user).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен, выданный сразу после изменения роли '
+            '(в ту же секунду), не считается отозванным.'
+        )
+        assert response.json()['role'] == 'moderator'
+
+    def test_05_revocation_survives_cache_eviction(self, user):
+        client = get_client(user)
+        user.role = 'admin'
+        user.save()
+        cache.clear()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что время отзыва токенов хранится в БД и токен '
+            'остаётся отозванным после вытеснения отметки из кэша.'
+        )
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Кино', 'slug': 'kino'}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_06_deleted_user_token_rejected(self, user):
+        client = get_client(user)
+        user.delete()
+        cache.clear()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токены удалённого пользователя отклоняются '
+            'и без отметки в кэше.'
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import user_cache
+
+User = get_user_model()
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "users_user"' in (
+            query['sql']
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21UserCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_cached_user_and_counters(self, user_client, user):
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                self.CATEGORIES_URL, data={'name': 'Кино', 'slug': 'kino'}
+            )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert not user_queries(context), (
+            'Проверьте, что пользователь для аутентификации берётся из кэша '
+            'без запроса к БД.'
+        )
+        stats = user_cache.stats()
+        assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+
+    def test_02_invalidated_on_role_change(self, user_client, admin_client,
+                                           user):
+        user_client.get('/api/v1/titles/')
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post(
+            self.CATEGORIES_URL, data={'name': 'Кино', 'slug': 'kino'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кэше аутентификации.'
+        )
+
+    def test_03_invalidated_on_delete(self, user_client, admin_client, user):
+        user_client.get('/api/v1/titles/')
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь удаляется из кэша '
+            'аутентификации.'
+        )
+
+    def test_04_lru_and_ttl(self, settings, user, admin, moderator):
+        settings.JWT_USER_CACHE_SIZE = 2
+        for cached in (user, admin, moderator):
+            user_cache.set(cached)
+        assert user_cache.get(user.pk) is None, (
+            'Проверьте, что при переполнении кэша вытесняется давно не '
+            'использованная запись.'
+        )
+        assert user_cache.get(admin.pk) == admin
+        settings.JWT_USER_CACHE_TIMEOUT = -1
+        user_cache.set(user)
+        assert user_cache.get(user.pk) is None, (
+            'Проверьте, что устаревшие записи кэша не используются.'
+        )
+
+    def test_05_me_patch_uses_fresh_user(self, admin_client, admin):
+        admin_client.get('/api/v1/users/me/')
+        User.objects.filter(pk=admin.pk).update(role='user')
+        response = admin_client.patch(
+            '/api/v1/users/me/', data={'bio': 'bio'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        admin.refresh_from_db()
+        assert (admin.role, admin.bio) == ('user', 'bio'), (
+            'Проверьте, что PATCH-запрос к `/api/v1/users/me/` сохраняет '
+            'пользователя, загруженного из БД, а не устаревшую копию '
+            'из кэша аутентификации.'
+        )
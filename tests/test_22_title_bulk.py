@@ -0,0 +1,121 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+def build_titles(count, genres=('horror', 'comedy'), category='films'):
+    return [
+        {
+            'name': f'Произведение {idx}',
+            'year': 2000 + idx,
+            'genre': list(genres),
+            'category': category,
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22TitleBulk:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def post_titles(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.TITLES_URL, data=titles,
+                                   format='json')
+        return response, len(context.captured_queries)
+
+    def test_01_bulk_create(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        response, few = self.post_titles(admin_client, build_titles(2))
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.TITLES_URL}` '
+            'со списком корректных произведений возвращает ответ со '
+            'статусом 201.'
+        )
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Произведение 0', 'Произведение 1'], (
+            'Проверьте, что ответ на пакетный POST-запрос содержит '
+            'созданные произведения в порядке запроса.'
+        )
+        assert {genre['slug'] for genre in data[0]['genre']} == {
+            'horror', 'comedy'}
+        assert data[0]['category']['slug'] == 'films'
+        assert Title.genre.through.objects.filter(
+            title_id__in=[title['id'] for title in data]).count() == 4, (
+            'Проверьте, что пакетный POST-запрос сохраняет жанры '
+            'произведений.'
+        )
+        _, many = self.post_titles(
+            admin_client, build_titles(20, ('horror', 'comedy', 'drama')))
+        assert few == many, (
+            'Проверьте, что количество запросов к БД при пакетном '
+            'POST-запросе не зависит от количества произведений и жанров: '
+            f'{few} запрос(ов) для двух произведений и {many} для двадцати.'
+        )
+
+    def test_02_bulk_create_is_atomic(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        titles = build_titles(3)
+        titles[1]['genre'] = ['horror', 'unknown']
+        titles[2]['category'] = 'unknown'
+        response, _ = self.post_titles(admin_client, titles)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакетный POST-запрос с некорректными '
+            'элементами возвращает ответ со статусом 400.'
+        )
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            'Проверьте, что ответ содержит ошибки по каждому элементу.'
+        )
+        assert 'unknown' in errors[1]['genre'][0]
+        assert 'category' in errors[2]
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в одном из элементов ни одно '
+            'произведение не создаётся.'
+        )
+
+    def test_03_bulk_create_limits(self, admin_client, settings):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        settings.TITLES_BULK_MAX_SIZE = 2
+        response, _ = self.post_titles(admin_client, build_titles(3))
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакет больше TITLES_BULK_MAX_SIZE '
+            'отклоняется со статусом 400.'
+        )
+        response, _ = self.post_titles(admin_client, [])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Title.objects.exists()
+
+    def test_04_bulk_create_ndjson(self, admin_client, user_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        body = '\n'.join(
+            json.dumps(title) for title in build_titles(3)) + '\n'
+        response = user_client.post(
+            self.TITLES_URL, data=body, content_type='application/x-ndjson')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пакетное создание произведений доступно только '
+            'администратору.'
+        )
+        response = admin_client.post(
+            self.TITLES_URL, data=body, content_type='application/x-ndjson')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что пакетный POST-запрос принимает NDJSON.'
+        )
+        assert Title.objects.count() == 3
+        response = admin_client.post(
+            self.TITLES_URL, data='{"name": \n',
+            content_type='application/x-ndjson')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,98 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from reviews.ratings import annotate_rating
+from tests.utils import create_titles_in_db
+
+DUPLICATE_MESSAGE = 'Вы уже оставили отзыв на это произведение.'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ReviewConflicts:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_no_lookup_before_insert(self, user_client):
+        title = create_titles_in_db(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'text',
+                                                   'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что перед созданием отзыва не выполняется запрос '
+            'на существование отзыва: уникальность проверяется '
+            'ограничением `unique_review`.'
+        )
+        response = user_client.post(url, data={'text': 'text', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'non_field_errors': [DUPLICATE_MESSAGE]}, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'прежнее сообщение об ошибке.'
+        )
+        title = annotate_rating(Title.objects.filter(pk=title.pk)).get()
+        assert (title.total_rating_sum, title.total_rating_count) == (5, 1), (
+            'Проверьте, что повторный отзыв не меняет рейтинг произведения.'
+        )
+
+    def test_02_atomic_requests(self, user_client, monkeypatch):
+        monkeypatch.setitem(connection.settings_dict, 'ATOMIC_REQUESTS', True)
+        title = create_titles_in_db(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        user_client.post(url, data={'text': 'text', 'score': 5})
+        response = user_client.post(url, data={'text': 'text', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что при ATOMIC_REQUESTS повторный отзыв '
+            'возвращает ответ со статусом 400.'
+        )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+
+    def test_03_concurrent_duplicate_reviews(self, token_user):
+        title = create_titles_in_db(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        statuses = []
+        barrier = threading.Barrier(8)
+
+        def post_review(score):
+            try:
+                client = APIClient()
+                client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
+                barrier.wait()
+                response = client.post(url, data={'text': 'text',
+                                                  'score': score})
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=post_review, args=(score,))
+            for score in range(1, 9)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(statuses) == [HTTPStatus.CREATED] + (
+            [HTTPStatus.BAD_REQUEST] * 7
+        ), (
+            'Проверьте, что при одновременных отзывах одного автора на '
+            'произведение создаётся один отзыв, а остальные запросы '
+            'получают ответ со статусом 400.'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+        title = annotate_rating(Title.objects.filter(pk=title.pk)).get()
+        assert title.total_rating_count == 1
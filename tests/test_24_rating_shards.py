@@ -0,0 +1,158 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title, TitleRatingShard
+from reviews.ratings import annotate_rating, compact_ratings
+from tests.utils import create_single_review, create_titles_in_db
+
+
+def get_totals(title_id):
+    title = annotate_rating(Title.objects.filter(pk=title_id)).get()
+    return title.total_rating_sum, title.total_rating_count
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24RatingShards:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_reviews_update_shards(self, client, user_client,
+                                      moderator_client, settings):
+        settings.RATING_SHARDS = 4
+        title = create_titles_in_db(1)[0]
+        create_single_review(user_client, title.id, 'text', 4)
+        create_single_review(moderator_client, title.id, 'text', 9)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что оценки отзывов учитываются в частях счётчиков, '
+            'а не в строке произведения.'
+        )
+        shards = TitleRatingShard.objects.filter(title=title)
+        assert set(shards.values_list('shard', flat=True)) <= set(range(4))
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 6, (
+            'Проверьте, что рейтинг произведения учитывает части счётчиков.'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] == 6
+
+    def test_02_compact_ratings(self, client, user_client, moderator_client,
+                                settings):
+        settings.RATING_SHARDS = 4
+        titles = create_titles_in_db(2)
+        for title in titles:
+            create_single_review(user_client, title.id, 'text', 4)
+            review = create_single_review(
+                moderator_client, title.id, 'text', 9).json()
+        # Удаление отзыва записывает отрицательное изменение в часть.
+        moderator_client.delete(
+            f'/api/v1/titles/{titles[1].id}/reviews/{review["id"]}/')
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1].id)
+        etag = client.get(url).headers['ETag']
+
+        assert compact_ratings(batch_size=1) == 2
+        for title in titles:
+            title.refresh_from_db()
+        assert [(title.rating_sum, title.rating_count)
+                for title in titles] == [(13, 2), (4, 1)], (
+            'Проверьте, что перенос частей счётчиков добавляет их значения '
+            'к рейтингу произведений.'
+        )
+        assert not TitleRatingShard.objects.exists(), (
+            'Проверьте, что опустевшие части счётчиков удаляются.'
+        )
+        assert get_totals(titles[1].id) == (4, 1)
+        assert compact_ratings() == 0
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что перенос частей счётчиков меняет ETag '
+            'произведения.'
+        )
+        call_command('compact_ratings', '--once')
+        call_command('recalculate_ratings', '--check')
+
+    def test_03_etag_follows_shards(self, client, user_client, settings):
+        settings.RATING_SHARDS = 4
+        title = create_titles_in_db(1)[0]
+        urls = (
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id),
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/reviews/',
+        )
+        etags = [client.get(url).headers['ETag'] for url in urls]
+        create_single_review(user_client, title.id, 'text', 7)
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после нового отзыва ETag ответа на '
+                f'GET-запрос к `{url}` меняется.'
+            )
+
+    def test_04_delete_title_with_shards(self, admin_client, user_client,
+                                         settings):
+        settings.RATING_SHARDS = 4
+        title = create_titles_in_db(1)[0]
+        create_single_review(user_client, title.id, 'text', 7)
+        response = admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not TitleRatingShard.objects.exists(), (
+            'Проверьте, что части счётчиков удаляются вместе '
+            'с произведением.'
+        )
+
+    def test_05_without_shards(self, user_client, settings):
+        settings.RATING_SHARDS = 0
+        title = create_titles_in_db(1)[0]
+        create_single_review(user_client, title.id, 'text', 7)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что при RATING_SHARDS = 0 оценки учитываются '
+            'в строке произведения.'
+        )
+        assert not TitleRatingShard.objects.exists()
+
+    def test_06_compact_removes_zeroed_shards(self, user_client, settings):
+        settings.RATING_SHARDS = 1
+        title = create_titles_in_db(1)[0]
+        review = create_single_review(user_client, title.id, 'text', 7).json()
+        user_client.delete(
+            f'/api/v1/titles/{title.id}/reviews/{review["id"]}/')
+        shard_modified = TitleRatingShard.objects.get().modified
+        assert compact_ratings() == 0
+        assert not TitleRatingShard.objects.exists(), (
+            'Проверьте, что перенос удаляет части счётчиков, обнулённые '
+            'созданием и удалением отзыва.'
+        )
+        title.refresh_from_db()
+        assert title.modified > shard_modified, (
+            'Проверьте, что удаление обнулённых частей счётчиков сдвигает '
+            'дату изменения произведения.'
+        )
+
+    def test_07_etag_after_compacting_zero_shards(self, client, user_client,
+                                                  settings):
+        settings.RATING_SHARDS = 1
+        title = create_titles_in_db(1)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = create_single_review(user_client, title.id, 'text', 7).json()
+        compact_ratings()
+        etag = client.get(url).headers['ETag']
+        response = user_client.patch(
+            f'{url}{review["id"]}/', data={'text': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        assert not TitleRatingShard.objects.exists(), (
+            'Проверьте, что изменение отзыва без изменения оценки не '
+            'записывает пустую часть счётчиков.'
+        )
+        compact_ratings()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения текста отзыва и переноса '
+            'частей счётчиков ETag списка отзывов меняется.'
+        )
+        assert response.json()['results'][0]['text'] == 'new'
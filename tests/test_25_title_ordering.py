@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleOrderingFilter
+from api.management.commands.explain_endpoints import WARNING_PATTERNS
+from reviews.models import Title
+from reviews.ratings import compact_ratings
+from tests.utils import create_single_review, create_titles_in_db
+
+# Сумма и количество оценок произведений.
+RATINGS = (
+    (10, 1), (160, 20), (0, 0), (45, 5), (90, 10), (7, 1),
+    (45, 5), (30, 10), (0, 0), (72, 8), (18, 2), (50, 5),
+)
+
+
+def create_rated_titles():
+    titles = create_titles_in_db(len(RATINGS))
+    for idx, (title, (rating_sum, rating_count)) in enumerate(
+            zip(titles, RATINGS)):
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            year=2000 + idx % 4,
+        )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_all_ids(self, client, query):
+        ids = []
+        url = f'{self.TITLES_URL}?{query}'
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_orderings(self, client):
+        create_rated_titles()
+        for value, ordering in TitleOrderingFilter.orderings.items():
+            expected = list(Title.objects.order_by(
+                *ordering).values_list('id', flat=True))
+            assert self.get_all_ids(client, f'ordering={value}') == (
+                expected), (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с '
+                f'параметром `ordering={value}` возвращает произведения '
+                'в соответствующем порядке.'
+            )
+            assert self.get_all_ids(
+                client, f'ordering={value}&pagination=cursor'
+            ) == expected, (
+                'Проверьте, что пагинация по курсору учитывает параметр '
+                f'`ordering={value}`.'
+            )
+
+    def test_02_rating_values(self, client):
+        titles = create_rated_titles()
+        response = client.get(f'{self.TITLES_URL}?ordering=-rating')
+        assert response.json()['results'][0]['id'] == titles[0].id, (
+            'Проверьте, что `ordering=-rating` начинает список с '
+            'произведения с наибольшей средней оценкой.'
+        )
+        ids = self.get_all_ids(client, 'ordering=-weighted_rating')
+        assert ids.index(titles[1].id) < ids.index(titles[0].id), (
+            'Проверьте, что байесовский рейтинг учитывает количество '
+            'оценок: произведение со средней 8 из 20 оценок выше '
+            'произведения с единственной оценкой 10.'
+        )
+        response = client.get(f'{self.TITLES_URL}?ordering=rating')
+        assert response.json()['results'][0]['id'] == titles[7].id, (
+            'Проверьте, что `ordering=rating` начинает список с '
+            'произведения с наименьшей средней оценкой.'
+        )
+        unrated = {titles[2].id, titles[8].id}
+        for value in ('rating', '-rating'):
+            ids = self.get_all_ids(client, f'ordering={value}')
+            assert set(ids[-len(unrated):]) == unrated, (
+                f'Проверьте, что при `ordering={value}` произведения без '
+                'оценок идут последними.'
+            )
+
+    def test_03_invalid_ordering(self, client):
+        response = client.get(f'{self.TITLES_URL}?ordering=description')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с '
+            'недопустимым значением `ordering` возвращает ответ со '
+            'статусом 400.'
+        )
+
+    def test_04_orderings_use_indexes(self):
+        create_rated_titles()
+        pattern = WARNING_PATTERNS[connection.vendor]
+        for value, ordering in TitleOrderingFilter.orderings.items():
+            plan = Title.objects.order_by(*ordering)[:5].explain()
+            assert not pattern.search(plan), (
+                f'Проверьте, что сортировка `ordering={value}` выполняется '
+                f'по индексу. План запроса:\n{plan}'
+            )
+
+    def test_05_ordering_after_compaction(self, client, user_client,
+                                          settings):
+        settings.RATING_SHARDS = 4
+        titles = create_titles_in_db(2)
+        create_single_review(user_client, titles[1].id, 'text', 9)
+        ids = self.get_all_ids(client, 'ordering=-rating')
+        assert ids[0] == titles[0].id
+        compact_ratings()
+        ids = self.get_all_ids(client, 'ordering=-rating')
+        assert ids[0] == titles[1].id, (
+            'Проверьте, что после переноса частей счётчиков сортировка '
+            'по рейтингу учитывает новые оценки.'
+        )
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from reviews.models import Category, Genre, Title
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +307,19 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def create_titles_in_db(count):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name=name, slug=slug)[0]
+        for name, slug in (('Ужасы', 'horror'), ('Комедия', 'comedy'))
+    ]
+    titles = []
+    for idx in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles